@@ -0,0 +1,32 @@
+import os
+import stat
+
+# Whole-file writes shared by the guide and tools scripts, stdlib only so
+# any of them can import it without pulling in ReportLab or NumPy.
+
+
+def write_atomic(path, data):
+    # Readers see either the old file or the complete new one: the data
+    # goes to a temporary file next to path, which then replaces it. Only
+    # regular files are replaced; renaming over a device such as /dev/null
+    # or a FIFO would swap it for a plain file.
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISREG(mode):
+            raise ValueError(f'{path}: not a regular file')
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
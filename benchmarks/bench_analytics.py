@@ -0,0 +1,111 @@
+# A month of synthetic /api/analytics/click log lines for the real catalog
+# (written like the route's JSON.stringify; tool popularity follows a Zipf
+# curve): full ingestion into daily
+# partitions, an incremental run after one more day is appended, the month
+# report from the partitions vs. rescanning the log with a dict per tool,
+# and the media kit PDF.
+#
+#   python benchmarks/bench_analytics.py --events 3000000
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools_analytics import ACTIONS, REVENUE_PER_EVENT, ingest, report, render_media_kit, month_range
+from tools_index import iter_catalog
+
+MONTH = '2025-06'
+# Share of events per action
+ACTION_WEIGHTS = (0.35, 0.45, 0.05, 0.1, 0.05)
+
+
+def write_log(path, tools, n, first_day, days, seed=0):
+    rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, len(tools) + 1)
+    picks = rng.choice(len(tools), n, p=popularity / popularity.sum())
+    actions = rng.choice(len(ACTIONS), n, p=ACTION_WEIGHTS)
+    seconds = np.sort(rng.integers(0, days * 86400, n))
+    stamps = (np.datetime64(first_day, 's') + seconds).astype(str)
+    with open(path, 'a') as f:
+        for tool, action, stamp in zip(picks.tolist(), actions.tolist(), stamps.tolist()):
+            t = tools[tool]
+            f.write('[MONETIZATION TRACKING] ' + json.dumps({
+                'toolId': t['id'], 'toolName': t['name'], 'toolUrl': t['url'], 'category': t['category'],
+                'action': ACTIONS[action], 'timestamp': stamp + '.000Z',
+                'revenue': REVENUE_PER_EVENT.get(ACTIONS[action], 0),
+            }, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+def rescan(path, start, end):
+    # What a report costs without partitions: parse every line again
+    counts = defaultdict(lambda: dict.fromkeys(ACTIONS, 0))
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line.split('] ', 1)[1])
+            if start <= entry['timestamp'][:10] <= end:
+                counts[entry['toolId']][entry['action']] += 1
+    return counts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    tools = list(iter_catalog())
+    start, end = month_range(MONTH)
+    work = tempfile.mkdtemp(prefix='megia-analytics-')
+    try:
+        log = os.path.join(work, 'site.log')
+        partitions = os.path.join(work, 'analytics')
+        _, generate_s = timed(lambda: write_log(log, tools, args.events, start, 29))
+
+        stats, ingest_s = timed(lambda: ingest([log], directory=partitions))
+        # One more day of traffic, appended to the same log
+        write_log(log, tools, args.events // 30, '2025-06-30', 1, seed=1)
+        more, incremental_s = timed(lambda: ingest([log], directory=partitions))
+
+        rep, report_s = timed(lambda: report(start, end, partitions, catalog=tools))
+        scanned, rescan_s = timed(lambda: rescan(log, start, end))
+        pdf, pdf_s = timed(lambda: render_media_kit(rep))
+
+        same = all(scanned[t['id']][a] == t[a] for t in rep['top_tools'] for a in ACTIONS)
+        results = {
+            'events': stats['events'] + more['events'],
+            'log_bytes': os.path.getsize(log),
+            'partition_bytes': sum(e.stat().st_size for e in os.scandir(partitions)),
+            'generate_s': generate_s,
+            'ingest_s': ingest_s,
+            'ingest_events_per_s': round(stats['events'] / ingest_s),
+            'incremental_ingest_s': incremental_s,
+            'incremental_events': more['events'],
+            'report_s': report_s,
+            'rescan_s': rescan_s,
+            'media_kit_s': pdf_s,
+            'media_kit_bytes': len(pdf),
+            'top_tools_match_rescan': same,
+        }
+        print(f"{results['events']:,} events: ingest {ingest_s}s, +1 day {incremental_s}s, "
+              f"month report {report_s}s (rescan {rescan_s}s), media kit {pdf_s}s", file=sys.stderr)
+        print(json.dumps(results, indent=2))
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Generation time and payload size of the guide in each output format, all
+# rendered from guide_content.json through guide_render.render(). Reports
+# the import cost of the format's code (HTML and Markdown never load
+# ReportLab), the first render, the mean of the rest (a different brand
+# each time, as the render service would see), and the payload raw and
+# gzipped, for the guide alone and with a catalog appendix.
+#
+#   python benchmarks/bench_formats.py --renders 10 --rows 0 2000
+#
+# Each format runs in a fresh interpreter so none inherits another's imports.
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FORMATS = ('pdf', 'html', 'markdown')
+
+
+def run_child(fmt, renders, rows):
+    from bench_story_memory import synthetic_tools
+
+    start = time.perf_counter()
+    from guide_render import render
+    if fmt == 'pdf':
+        import generate_monetization_guide  # noqa: F401  (what a PDF request loads)
+    import_s = time.perf_counter() - start
+
+    samples = []
+    for i in range(renders):
+        config = {'brand': f'Marca {i}', 'catalog': synthetic_tools(rows) if rows else None}
+        start = time.perf_counter()
+        data = render(fmt, config)
+        samples.append(time.perf_counter() - start)
+    print(json.dumps({
+        'format': fmt,
+        'catalog_rows': rows,
+        'import_ms': round(import_s * 1000, 1),
+        'first_ms': round(samples[0] * 1000, 1),
+        'mean_ms': round(statistics.mean(samples[1:] or samples) * 1000, 2),
+        'bytes': len(data),
+        'gzip_bytes': len(gzip.compress(data)),
+        'reportlab_loaded': 'reportlab' in sys.modules,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=10)
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 2000], help='catalog rows per run')
+    parser.add_argument('--child', nargs=2, metavar=('FORMAT', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.renders, int(args.child[1]))
+        return
+
+    results = []
+    for rows in args.rows:
+        for fmt in FORMATS:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', fmt, str(rows), '--renders', str(args.renders)],
+                check=True, capture_output=True, text=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{fmt:<8} {rows:>6} rows  import {result['import_ms']:>7.1f}ms  first {result['first_ms']:>8.1f}ms  "
+                  f"then {result['mean_ms']:>8.2f}ms  {result['bytes']:>9,} bytes ({result['gzip_bytes']:,} gzipped)",
+                  file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# File size and render+write time of the default output vs. compact mode.
+# Every render is written atomically to a temporary directory, the same way
+# render_guide() writes the real guide.
+#
+#   python benchmarks/bench_output_size.py --cover-image download/megia-avatar.png --catalog 0 2000
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+import generate_monetization_guide as guide
+from bench_story_memory import synthetic_tools
+
+MODES = {
+    'default': {},
+    'compact': {'compact': True},
+}
+
+
+def measure(config, rows, repeat):
+    times = []
+    for _ in range(repeat):
+        config = dict(config)
+        if rows:
+            # A fresh iterator per render; the catalog is consumed lazily
+            config['catalog'] = synthetic_tools(rows)
+        start = time.perf_counter()
+        path = guide.render_guide(config)
+        times.append(time.perf_counter() - start)
+    return {'bytes': os.path.getsize(path), 'write_s': round(min(times), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--catalog', type=int, nargs='+', default=[0, 2000], help='catalog rows appended to the guide')
+    parser.add_argument('--cover-image', default=os.path.join(os.path.dirname(ROOT), 'download', 'megia-avatar.png'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Warm fonts and styles so neither mode pays for them
+    guide.render_guide({'output': None})
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.catalog:
+            row = {'catalog_rows': rows}
+            for mode, overrides in MODES.items():
+                config = {
+                    'output': os.path.join(tmp, f'{mode}.pdf'),
+                    'cover_image': args.cover_image,
+                    **overrides,
+                }
+                row[mode] = measure(config, rows, args.repeat)
+            saved = 1 - row['compact']['bytes'] / row['default']['bytes']
+            row['bytes_saved'] = row['default']['bytes'] - row['compact']['bytes']
+            results.append(row)
+            print(f"{rows:>6} rows  default {row['default']['bytes']:>9,} B {row['default']['write_s']:.3f}s"
+                  f"  compact {row['compact']['bytes']:>9,} B {row['compact']['write_s']:.3f}s"
+                  f"  -{saved:.0%}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
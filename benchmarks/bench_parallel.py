@@ -0,0 +1,67 @@
+# Wall-clock time of a guide with a large catalog appendix: the single-pass
+# build vs. parts laid out in a process pool and merged. Also times every
+# part on its own; the slowest part bounds what any number of cores can do.
+#
+#   python benchmarks/bench_parallel.py --rows 20000 --workers 1 2 4 8
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_monetization_guide as guide
+from bench_story_memory import synthetic_tools
+
+
+def timed_render(rows, **overrides):
+    start = time.perf_counter()
+    guide.render_guide({'output': None, 'catalog': synthetic_tools(rows), **overrides})
+    return round(time.perf_counter() - start, 3)
+
+
+def part_times(rows, part_rows):
+    cfg = guide.resolve_config({'catalog': synthetic_tools(rows), 'catalog_part_rows': part_rows})
+    times = {}
+    for name, section, part_cfg in guide._iter_parts(cfg, split_catalog=True):
+        if name == 'toc':
+            continue
+        start = time.perf_counter()
+        guide._render_part(section, part_cfg, guide.subset_seeds())
+        times[name] = round(time.perf_counter() - start, 3)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--part-rows', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    guide._init_worker()
+    single = timed_render(args.rows)
+    parts = part_times(args.rows, args.part_rows)
+    result = {
+        'rows': args.rows,
+        'cpus': os.cpu_count(),
+        'single_pass_s': single,
+        'parts': len(parts),
+        'sum_of_parts_s': round(sum(parts.values()), 3),
+        'slowest_part_s': max(parts.values()),
+        'parallel_s': {},
+    }
+    print(f"{args.rows} rows on {result['cpus']} CPUs: single pass {single:.2f}s, "
+          f"{len(parts)} parts summing to {result['sum_of_parts_s']:.2f}s, slowest {result['slowest_part_s']:.2f}s",
+          file=sys.stderr)
+    for workers in args.workers:
+        elapsed = timed_render(args.rows, workers=workers, catalog_part_rows=args.part_rows)
+        result['parallel_s'][workers] = elapsed
+        print(f'  {workers:>2} workers  {elapsed:.2f}s  x{single / elapsed:.2f}', file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# Phase-by-phase timings for the guide pipeline:
+#
+#   import   importing generate_monetization_guide
+#   fonts    registering the TTF fonts (cached faces, see guide_fonts)
+#   styles   build_styles()
+#   story    assembling the full story list
+#   layout   doc.build() minus the final canvas.save()
+#   save     PDF serialization in canvas.save()
+#
+# Every scenario runs in a fresh interpreter so import cost and peak RSS are
+# real. Results go to JSON; pass --compare to diff against an earlier run.
+#
+#   python benchmarks/bench_pipeline.py -o bench.json
+#   python benchmarks/bench_pipeline.py --compare bench.json
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ('import', 'fonts', 'styles', 'story', 'layout', 'save')
+DEFAULT_SCENARIOS = ['guide', 'lists-1000', 'lists-20000', 'catalog-1000', 'catalog-20000']
+
+
+def scenario_config(name):
+    # guide: the real GUIA_MONETIZACION_MEGIA content
+    # lists-N: every bullet list in the guide grown to N items in total
+    # catalog-N: the guide plus an N-row catalog appendix
+    from guide_content import CONTENT
+    from bench_story_memory import synthetic_tools
+
+    if name == 'guide':
+        return {}
+    kind, n = name.rsplit('-', 1)
+    n = int(n)
+    if kind == 'lists':
+        per_list = max(1, n // 4)
+        lists = CONTENT['lists']
+        return {
+            key: [f'{lists[key][i % len(lists[key])]}{suffix.format(i)}' for i in range(per_list)]
+            for key, suffix in (('tips_adsense', ' ({})'), ('premium_ideas', ' ({})'),
+                                ('sponsor_tips', ' ({})'), ('links', '?ref={}'))
+        }
+    if kind == 'catalog':
+        return {'catalog': synthetic_tools(n)}
+    raise ValueError(f'unknown scenario {name!r}')
+
+
+def run_child(name):
+    timings = {}
+    start = time.perf_counter()
+    import generate_monetization_guide as guide
+    from guide_fonts import ensure_fonts
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import SimpleDocTemplate
+    import io
+    timings['import'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ensure_fonts()
+    timings['fonts'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    st = guide.build_styles()
+    timings['styles'] = time.perf_counter() - start
+
+    cfg = guide.resolve_config(scenario_config(name))
+    start = time.perf_counter()
+    story = guide.build_story(cfg, st)
+    timings['story'] = time.perf_counter() - start
+    flowable_count = len(story)
+
+    save_time = []
+
+    class TimedCanvas(Canvas):
+        def save(self):
+            t = time.perf_counter()
+            super().save()
+            save_time.append(time.perf_counter() - t)
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4)
+    start = time.perf_counter()
+    doc.build(story, canvasmaker=TimedCanvas)
+    total = time.perf_counter() - start
+    timings['layout'] = total - save_time[0]
+    timings['save'] = save_time[0]
+
+    print(json.dumps({
+        'timings': timings,
+        'pages': doc.page,
+        'flowables': flowable_count,
+        'output_bytes': len(buf.getvalue()),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def run_scenario(name, repeat):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, os.path.dirname(__file__), env.get('PYTHONPATH')]))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, __file__, '--child', name],
+                             check=True, capture_output=True, text=True, env=env)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    result = {k: v for k, v in runs[0].items() if k != 'timings'}
+    result['timings'] = {p: round(statistics.median(r['timings'][p] for r in runs), 5) for p in PHASES}
+    result['total_s'] = round(sum(result['timings'].values()), 5)
+    result['peak_rss_mb'] = round(max(r['peak_rss_mb'] for r in runs), 1)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    base = baseline['scenarios']
+    for name, result in current['scenarios'].items():
+        if name not in base:
+            continue
+        print(f'{name}:', file=sys.stderr)
+        rows = [(p, base[name]['timings'][p], result['timings'][p]) for p in PHASES]
+        rows.append(('total', base[name]['total_s'], result['total_s']))
+        for phase, old, new in rows:
+            delta = (new - old) / old * 100 if old else 0.0
+            print(f'  {phase:<8} {old:>10.4f}s -> {new:>10.4f}s  {delta:+7.1f}%', file=sys.stderr)
+        print(f"  size     {base[name]['output_bytes']:>10} -> {result['output_bytes']:>10} bytes", file=sys.stderr)
+        print(f"  rss      {base[name]['peak_rss_mb']:>10} -> {result['peak_rss_mb']:>10} MB", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', default=DEFAULT_SCENARIOS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', help='write results JSON here (default: stdout)')
+    parser.add_argument('--compare', help='earlier results JSON to diff against')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        run_child(args.child)
+        return
+
+    import reportlab
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'reportlab': reportlab.Version,
+        'repeat': args.repeat,
+        'scenarios': {},
+    }
+    for name in args.scenarios:
+        result = run_scenario(name, args.repeat)
+        results['scenarios'][name] = result
+        print(f"{name:<16} {result['total_s']:>9.3f}s  {result['pages']:>6} pages  "
+              f"{result['output_bytes']:>10} bytes  {result['peak_rss_mb']:>7.1f} MB", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# /api/tools lookups: the route's linear toLowerCase().includes() scan
+# (ported line for line) vs. tools_index.SearchIndex, on the real catalog
+# and on copies of it scaled up to show how each grows with catalog size.
+#
+#   python benchmarks/bench_search_index.py --scale 1 4 16
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools_index import SearchIndex, build_index, iter_catalog
+
+QUERIES = [
+    {'search': 'chat'},
+    {'search': 'imagen'},
+    {'search': 'video editor'},
+    {'search': 'gpt', 'category': 'coding'},
+    {'search': 'music', 'featured': True},
+    {'search': 'presentaciones', 'top_rated': True},
+    {'category': 'images', 'trending': True},
+    {'newest': True, 'page': 2},
+    {'top_rated': True},
+    {'search': 'xyzzy'},
+]
+
+
+def route_scan(tools, search='', category='all', featured=False, trending=False,
+               newest=False, top_rated=False, page=1, limit=50):
+    # src/app/api/tools/route.ts
+    filtered = list(tools)
+    if category and category != 'all':
+        filtered = [t for t in filtered if t['category'] == category]
+    if search:
+        search_lower = search.lower()
+        filtered = [t for t in filtered
+                    if search_lower in t['name'].lower()
+                    or search_lower in (t['description'] or '').lower()
+                    or search_lower in (t['description_es'] or '').lower()]
+    if featured:
+        filtered = [t for t in filtered if t['featured']]
+    if trending:
+        filtered = [t for t in filtered if t['trending']]
+    if newest:
+        filtered = [t for t in filtered if t['is_new']]
+    if top_rated:
+        filtered = sorted((t for t in filtered if t['rating'] and t['rating'] >= 4.5),
+                          key=lambda t: -(t['rating'] or 0))
+    start = (page - 1) * limit
+    return len(filtered), filtered[start:start + limit]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {'p50_ms': round(pick(0.5) * 1000, 4), 'p99_ms': round(pick(0.99) * 1000, 4)}
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    catalog = list(iter_catalog())
+    results = []
+    for scale in args.scale:
+        tools = catalog * scale
+        start = time.perf_counter()
+        data = json.dumps(build_index(tools))
+        built = time.perf_counter()
+        index = SearchIndex(json.loads(data)).warm()
+        loaded = time.perf_counter()
+
+        scan_samples, index_samples = [], []
+        agree = 0
+        for params in QUERIES:
+            scan_total, _ = route_scan(tools, **params)
+            index_total, _ = index.query(**params)
+            agree += scan_total == index_total
+            scan_samples += timed(lambda: route_scan(tools, **params), max(1, args.repeat // scale))
+            index_samples += timed(lambda: index.query(**params), args.repeat)
+
+        row = {
+            'tools': len(tools),
+            'index_bytes': len(data),
+            'build_s': round(built - start, 3),
+            'load_s': round(loaded - built, 3),
+            'scan': percentiles(scan_samples),
+            'index': percentiles(index_samples),
+            'same_total': f'{agree}/{len(QUERIES)}',
+        }
+        results.append(row)
+        print(f"{len(tools):>7} tools  scan p50 {row['scan']['p50_ms']:>8.3f}ms p99 {row['scan']['p99_ms']:>8.3f}ms"
+              f"  index p50 {row['index']['p50_ms']:>6.3f}ms p99 {row['index']['p99_ms']:>6.3f}ms"
+              f"  same totals {row['same_total']}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Peak RSS of a guide render with a synthetic catalog appendix, streamed
+# through FlowableStream vs. materialized as one story list.
+#
+#   python benchmarks/bench_story_memory.py --sizes 1000 10000 100000
+#
+# Each measurement runs in a fresh interpreter so ru_maxrss is not shared.
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CATEGORIES = ('audio', 'images', 'video', 'chat', 'coding', 'productivity',
+              'presentations', 'data', '3d', 'marketing', 'research')
+PRICING = ('free', 'freemium', 'paid')
+
+
+def synthetic_tools(n):
+    for i in range(n):
+        yield {
+            'name': f'Herramienta IA {i}',
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'pricing': PRICING[i % len(PRICING)],
+            'rating': 4.0 + (i % 10) / 10,
+        }
+
+
+def run_child(rows, mode):
+    import generate_monetization_guide as guide
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    # Both modes build the PDF in memory and drop it
+    cfg = guide.resolve_config({'output': None, 'catalog': synthetic_tools(rows)})
+    start = time.perf_counter()
+    if mode == 'stream':
+        guide.render_guide(cfg)
+    else:
+        doc = SimpleDocTemplate(io.BytesIO(), pagesize=A4)
+        doc.build(guide.build_story(cfg, guide.get_styles()))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'rows': rows, 'mode': mode, 'seconds': round(elapsed, 3), 'peak_rss_mb': round(peak_kb / 1024, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--modes', nargs='+', default=['stream', 'list'])
+    parser.add_argument('--child', nargs=2, metavar=('ROWS', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(int(args.child[0]), args.child[1])
+        return
+
+    results = []
+    for rows in args.sizes:
+        for mode in args.modes:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', str(rows), mode],
+                check=True, capture_output=True, text=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{rows:>7} rows  {mode:<6}  {result['seconds']:>8.2f}s  {result['peak_rss_mb']:>8.1f} MB", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
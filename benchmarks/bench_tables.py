@@ -0,0 +1,78 @@
+# Catalog-sized tables: one Paragraph per cell (the original approach) vs.
+# guide_tables.build_table. Times construction plus full layout/serialization.
+#
+#   python benchmarks/bench_tables.py --rows 1000 10000
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table
+
+import generate_monetization_guide as guide
+from guide_tables import build_table, table_style, string_width, wrap_text
+from guide_content import catalog_rows
+from bench_story_memory import synthetic_tools
+
+COL_WIDTHS = [6*cm, 3.5*cm, 3*cm, 2.5*cm]
+CHUNK = 40
+
+
+def _rows(n):
+    return list(catalog_rows(synthetic_tools(n)))
+
+
+def paragraph_tables(rows, st):
+    for i in range(0, len(rows), CHUNK):
+        data = [[Paragraph(f'<b>{h}</b>', st['table_header']) for h in guide.catalog_header]]
+        data.extend([Paragraph(cell, st['table_cell']) for cell in row] for row in rows[i:i + CHUNK])
+        table = Table(data, colWidths=COL_WIDTHS, repeatRows=1)
+        table.setStyle(table_style(4))
+        yield table
+
+
+def fast_tables(rows, st):
+    for i in range(0, len(rows), CHUNK):
+        yield build_table(guide.catalog_header, rows[i:i + CHUNK], COL_WIDTHS, st['table_cell'], padding=4, repeat_rows=1)
+
+
+def measure(builder, rows, st):
+    start = time.perf_counter()
+    flowables = list(builder(rows, st))
+    built = time.perf_counter()
+    SimpleDocTemplate(io.BytesIO(), pagesize=A4).build(flowables)
+    done = time.perf_counter()
+    return {'construct_s': round(built - start, 4), 'layout_s': round(done - built, 4), 'total_s': round(done - start, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    st = guide.get_styles()
+    # Warm fonts so neither side pays for registration
+    measure(fast_tables, _rows(10), st)
+
+    results = []
+    for n in args.rows:
+        rows = _rows(n)
+        slow = measure(paragraph_tables, rows, st)
+        string_width.cache_clear()
+        wrap_text.cache_clear()
+        fast = measure(fast_tables, rows, st)
+        speedup = round(slow['total_s'] / fast['total_s'], 2)
+        results.append({'rows': n, 'paragraph_cells': slow, 'fast_cells': fast, 'speedup': speedup})
+        print(f"{n:>7} rows  paragraph {slow['total_s']:>8.2f}s  fast {fast['total_s']:>8.2f}s  x{speedup}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
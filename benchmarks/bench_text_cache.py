@@ -0,0 +1,77 @@
+# A batch of templated guide renders (same content, a different brand and
+# year each) in one process, with ReportLab's stock Paragraph and CJK
+# wrapping vs. guide_text's Latin wrapping and shared measurement caches.
+# Reports the first render, the mean of the rest, and the stringWidth calls
+# that actually reach the font (from a traced render at the end).
+#
+#   python benchmarks/bench_text_cache.py --renders 20
+#
+# Each mode runs in a fresh interpreter so neither starts with warm caches.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ('stock', 'cached')
+
+
+def run_child(mode, renders):
+    from contextlib import nullcontext
+    from reportlab.platypus import Paragraph
+    from guide_trace import LayoutTrace
+    import generate_monetization_guide as guide
+    import guide_tables
+
+    if mode == 'stock':
+        guide.Paragraph = guide_tables.GuideParagraph = Paragraph
+        guide.cached_measurement = nullcontext
+    guide._init_worker()
+
+    samples = []
+    for i in range(renders):
+        start = time.perf_counter()
+        data = guide.render_guide({'output': None, 'brand': f'Marca {i}', 'year': str(2000 + i)})
+        samples.append(time.perf_counter() - start)
+    trace = LayoutTrace()
+    guide.render_guide({'output': None, 'brand': 'Marca final'}, trace=trace)
+    print(json.dumps({
+        'mode': mode,
+        'first_ms': round(samples[0] * 1000, 1),
+        'mean_ms': round(statistics.mean(samples[1:]) * 1000, 1),
+        'pdf_bytes': len(data),
+        'pages': trace.pages,
+        'string_width_calls': trace.counters['string_width_calls'],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=20)
+    parser.add_argument('--child', metavar='MODE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.renders)
+        return
+
+    results = []
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--renders', str(args.renders)],
+            check=True, capture_output=True, text=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{mode:<7} first {result['first_ms']:>7.1f}ms  then {result['mean_ms']:>7.1f}ms/render  "
+              f"{result['string_width_calls']:>6} stringWidth calls  {result['pages']} pages", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,446 +1,633 @@
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.platypus import SimpleDocTemplate, Spacer, Image, PageBreak
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.lib import colors
-from reportlab.lib.units import inch, cm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.lib.units import cm
+from guide_fonts import (GuideParagraphStyle as ParagraphStyle, ensure_fonts, share_subsets, document_chars,
+                         font_digest, FONT_FILES)
+from guide_flowables import FlowableStream, TocLine, SectionAnchor, PageNumberForms
+from guide_cache import (SectionCache, SECTION_CACHE_DIR, SEED_CACHE_DIR, section_key, seeds_key,
+                         styles_fingerprint)
+from atomic_files import write_atomic
+from guide_merge import merge_pdfs, count_pages, compact_pdf
+from guide_compact import compact_settings, downsampled_image, DEFAULT_IMAGE_DPI
+from guide_tables import build_table
+from guide_text import GuideParagraph as Paragraph, cached_measurement
+from guide_content import (CONTENT, CONTENT_PATH, META_KEYS, TOC_SECTIONS, content_config, get_section,
+                           iter_blocks, section_inputs, catalog_rows)
+from reportlab.pdfgen.canvas import Canvas
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import chain, islice
+from xml.sax.saxutils import escape
+import argparse
+import hashlib
+import io
+import json
 import os
 
-# Register fonts
-pdfmetrics.registerFont(TTFont('SimHei', '/usr/share/fonts/truetype/chinese/SimHei.ttf'))
-pdfmetrics.registerFont(TTFont('Times New Roman', '/usr/share/fonts/truetype/english/Times-New-Roman.ttf'))
-registerFontFamily('SimHei', normal='SimHei', bold='SimHei')
-registerFontFamily('Times New Roman', normal='Times New Roman', bold='Times New Roman')
-
-# Create document
-doc = SimpleDocTemplate(
-    "/home/z/my-project/download/GUIA_MONETIZACION_MEGIA.pdf",
-    pagesize=A4,
-    title="Guia de Monetizacion MEG.IA",
-    author='Z.ai',
-    creator='Z.ai',
-    subject='Guia completa para monetizar tu web de links'
-)
-
-# Styles
-styles = getSampleStyleSheet()
-
-title_style = ParagraphStyle(
-    name='TitleStyle',
-    fontName='SimHei',
-    fontSize=28,
-    leading=36,
-    alignment=TA_CENTER,
-    textColor=colors.HexColor('#6366f1'),
-    spaceAfter=20
-)
-
-heading1_style = ParagraphStyle(
-    name='Heading1Style',
-    fontName='SimHei',
-    fontSize=18,
-    leading=24,
-    alignment=TA_LEFT,
-    textColor=colors.HexColor('#6366f1'),
-    spaceBefore=20,
-    spaceAfter=12,
-    leftIndent=0
-)
-
-heading2_style = ParagraphStyle(
-    name='Heading2Style',
-    fontName='SimHei',
-    fontSize=14,
-    leading=20,
-    alignment=TA_LEFT,
-    textColor=colors.HexColor('#8b5cf6'),
-    spaceBefore=15,
-    spaceAfter=8
-)
-
-body_style = ParagraphStyle(
-    name='BodyStyle',
-    fontName='SimHei',
-    fontSize=11,
-    leading=18,
-    alignment=TA_LEFT,
-    spaceBefore=6,
-    spaceAfter=6,
-    wordWrap='CJK'
-)
-
-list_style = ParagraphStyle(
-    name='ListStyle',
-    fontName='SimHei',
-    fontSize=11,
-    leading=18,
-    alignment=TA_LEFT,
-    leftIndent=20,
-    spaceBefore=4,
-    spaceAfter=4,
-    wordWrap='CJK'
-)
+# Fonts are registered lazily (see guide_fonts) the first time a style uses them
 
-highlight_style = ParagraphStyle(
-    name='HighlightStyle',
-    fontName='SimHei',
-    fontSize=11,
-    leading=18,
-    alignment=TA_LEFT,
-    backColor=colors.HexColor('#f0f9ff'),
-    leftIndent=10,
-    rightIndent=10,
-    spaceBefore=8,
-    spaceAfter=8,
-    wordWrap='CJK'
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'download', 'GUIA_MONETIZACION_MEGIA.pdf'
 )
 
-# Content
-story = []
-
-# Cover
-story.append(Spacer(1, 100))
-story.append(Paragraph("GUIA COMPLETA DE MONETIZACION", title_style))
-story.append(Spacer(1, 20))
-story.append(Paragraph("MEG.IA", ParagraphStyle(
-    name='BrandName',
-    fontName='SimHei',
-    fontSize=36,
-    leading=44,
-    alignment=TA_CENTER,
-    textColor=colors.HexColor('#8b5cf6')
-)))
-story.append(Spacer(1, 30))
-story.append(Paragraph("Como ganar dinero con tu Link Hub", ParagraphStyle(
-    name='Subtitle',
-    fontName='SimHei',
-    fontSize=16,
-    leading=22,
-    alignment=TA_CENTER,
-    textColor=colors.gray
-)))
-story.append(Spacer(1, 50))
-story.append(Paragraph("2025", ParagraphStyle(
-    name='Year',
-    fontName='Times New Roman',
-    fontSize=14,
-    alignment=TA_CENTER,
-    textColor=colors.gray
-)))
-story.append(PageBreak())
-
-# Table of Contents
-story.append(Paragraph("CONTENIDO", heading1_style))
-story.append(Spacer(1, 20))
-toc_items = [
-    "1. Google AdSense - Publicidad en tu Web",
-    "2. Links de Afiliados - Comisiones por Recomendaciones",
-    "3. Donaciones - Apoyo Directo de Seguidores",
-    "4. Contenido Premium - Ingresos Recurrentes",
-    "5. Patrocinios - Colaboraciones con Marcas",
-    "6. Resumen y Plan de Accion"
-]
-for item in toc_items:
-    story.append(Paragraph(item, body_style))
-    story.append(Spacer(1, 8))
-story.append(PageBreak())
-
-# Section 1: Google AdSense
-story.append(Paragraph("1. Google AdSense - Publicidad en tu Web", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Que es Google AdSense?</b>", heading2_style))
-story.append(Paragraph(
-    "Google AdSense es la plataforma de publicidad mas popular del mundo que te permite ganar dinero mostrando anuncios relevantes en tu sitio web. Funciona de manera automatica: Google coloca anuncios que coinciden con el contenido de tu pagina y tus visitantes, y tu ganas dinero cada vez que alguien ve o hace clic en esos anuncios. Es completamente gratuito y se integra facilmente con cualquier sitio web, incluido tu Link Hub de MEG.IA.",
-    body_style
-))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Como crear una cuenta de Google AdSense:</b>", heading2_style))
-
-steps_adsense = [
-    ("Paso 1", "Ve a www.google.com/adsense y haz clic en 'Comenzar'. Necesitaras una cuenta de Google (Gmail) para continuar con el proceso de registro."),
-    ("Paso 2", "Ingresa la URL de tu sitio web (tu Link Hub) y selecciona el idioma principal de tu contenido. Asegurate de que tu URL sea correcta."),
-    ("Paso 3", "Completa tu informacion personal incluyendo nombre, direccion y datos fiscales. Esto es necesario para recibir los pagos."),
-    ("Paso 4", "Conecta tu sitio a AdSense. Google te dara un codigo HTML que debes agregar a tu web. En tu caso, esto ya esta preparado en los espacios designados."),
-    ("Paso 5", "Espera la aprobacion. Google revisara tu sitio para asegurar que cumple con sus politicas. Este proceso puede tardar de 1 a 2 semanas."),
-    ("Paso 6", "Una vez aprobado, los anuncios comenzaran a mostrarse automaticamente y empezaras a generar ingresos.")
-]
-
-for step, desc in steps_adsense:
-    story.append(Paragraph(f"<b>{step}:</b> {desc}", list_style))
-    story.append(Spacer(1, 6))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Consejos para maximizar ingresos con AdSense:</b>", heading2_style))
-
-tips_adsense = [
-    "Coloca anuncios en posiciones visibles pero no intrusivas - los espacios ya preparados en tu web estan optimizados para esto.",
-    "Genera trafico de calidad - mientras mas visitas reales tengas, mas ganaras. Comparte tu link en todas tus redes sociales.",
-    "Crea contenido valioso - los anuncios mejor pagados aparecen en sitios con contenido relevante y de calidad.",
-    "Elige formatos de anuncios responsive - se adaptan automaticamente al tamano de pantalla del usuario.",
-    "No hagas clic en tus propios anuncios - Google detecta esto y puede suspender tu cuenta permanentemente."
-]
-
-for tip in tips_adsense:
-    story.append(Paragraph(f"- {tip}", list_style))
-    story.append(Spacer(1, 4))
-
-story.append(PageBreak())
-
-# Section 2: Affiliate Links
-story.append(Paragraph("2. Links de Afiliados - Comisiones por Recomendaciones", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Que son los programas de afiliados?</b>", heading2_style))
-story.append(Paragraph(
-    "Los programas de afiliados son acuerdos comerciales donde una empresa te paga una comision por cada venta o accion que se genere a traves de tu enlace unico. Es una de las formas mas rentables de monetizar contenido de tecnologia e IA, ya que muchas herramientas y cursos ofrecen comisiones generosas. Como creador de contenido sobre IA, tienes la ventaja de recomendar productos que tu audiencia realmente necesita.",
-    body_style
-))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Mejores programas de afiliados para creadores de IA:</b>", heading2_style))
-
-# Table for affiliate programs
-header_style_tbl = ParagraphStyle(
-    name='TableHeader',
-    fontName='SimHei',
-    fontSize=10,
-    textColor=colors.white,
-    alignment=TA_CENTER
-)
-cell_style_tbl = ParagraphStyle(
-    name='TableCell',
-    fontName='SimHei',
-    fontSize=9,
-    alignment=TA_CENTER,
-    wordWrap='CJK'
-)
-
-affiliate_data = [
-    [Paragraph('<b>Programa</b>', header_style_tbl), Paragraph('<b>Comision</b>', header_style_tbl), Paragraph('<b>Categoria</b>', header_style_tbl)],
-    [Paragraph('Amazon Associates', cell_style_tbl), Paragraph('1-10%', cell_style_tbl), Paragraph('Libros, gadgets, tech', cell_style_tbl)],
-    [Paragraph('Coursera', cell_style_tbl), Paragraph('Hasta 45%', cell_style_tbl), Paragraph('Cursos de IA/ML', cell_style_tbl)],
-    [Paragraph('Udemy', cell_style_tbl), Paragraph('15-50%', cell_style_tbl), Paragraph('Cursos varios', cell_style_tbl)],
-    [Paragraph('Notion', cell_style_tbl), Paragraph('50%', cell_style_tbl), Paragraph('Productividad', cell_style_tbl)],
-    [Paragraph('Jasper AI', cell_style_tbl), Paragraph('30% recurrente', cell_style_tbl), Paragraph('Herramienta de IA', cell_style_tbl)],
-    [Paragraph('Copy.ai', cell_style_tbl), Paragraph('45%', cell_style_tbl), Paragraph('Generacion de texto', cell_style_tbl)],
-    [Paragraph('Canva', cell_style_tbl), Paragraph('36$', cell_style_tbl), Paragraph('Diseno grafico', cell_style_tbl)],
-    [Paragraph('Hostinger', cell_style_tbl), Paragraph('Hasta 60%', cell_style_tbl), Paragraph('Hosting web', cell_style_tbl)],
-]
-
-table = Table(affiliate_data, colWidths=[4*cm, 3*cm, 4*cm])
-table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
-    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('FONTNAME', (0, 0), (-1, -1), 'SimHei'),
-    ('FONTSIZE', (0, 0), (-1, 0), 10),
-    ('FONTSIZE', (0, 1), (-1, -1), 9),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-    ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-]))
-story.append(table)
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Como registrarse en Amazon Associates (el mas facil):</b>", heading2_style))
-
-steps_amazon = [
-    ("Paso 1", "Ve a affiliate-program.amazon.com y haz clic en 'Unirse ahora gratis'. Necesitaras una cuenta de Amazon existente."),
-    ("Paso 2", "Ingresa la informacion de tu cuenta, incluyendo la direccion de pago donde recibiras las comisiones."),
-    ("Paso 3", "Describe tu sitio web y como planeas promocionar productos de Amazon. Se honesto sobre tu contenido."),
-    ("Paso 4", "Genera tus primeros enlaces de afiliado usando la herramienta SiteStripe de Amazon para cualquier producto."),
-    ("Paso 5", "Coloca estos enlaces en tu Link Hub en las secciones de 'Herramientas' o 'Tienda'.")
-]
-
-for step, desc in steps_amazon:
-    story.append(Paragraph(f"<b>{step}:</b> {desc}", list_style))
-    story.append(Spacer(1, 6))
-
-story.append(PageBreak())
-
-# Section 3: Donations
-story.append(Paragraph("3. Donaciones - Apoyo Directo de Seguidores", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Plataformas de donaciones populares:</b>", heading2_style))
-story.append(Paragraph(
-    "Las donaciones son una forma directa y honesta de monetizar tu contenido. Tus seguidores mas fieles pueden apoyarte voluntariamente a cambio del valor que les proporcionas. Existen varias plataformas disenadas especificamente para creadores de contenido, cada una con sus propias ventajas y caracteristicas unicas.",
-    body_style
-))
-
-donation_platforms = [
-    ("Ko-fi", "ko-fi.com", "Sin comisiones, ideal para 'invitar un cafe'. Permite metas de financiamiento y tienda de productos digitales. Perfecto para empezar."),
-    ("Buy Me a Coffee", "buymeacoffee.com", "Plataforma muy popular, facil de usar. Cobra 5% de comision en el plan gratuito. Muy intuitiva para los seguidores."),
-    ("PayPal.me", "paypal.me", "El mas sencillo - solo necesitas una cuenta de PayPal. Sin comisiones para el creador, pero menos funciones."),
-    ("Patreon", "patreon.com", "Ideal para contenido exclusivo recurrente. Permite crear niveles de membresia con beneficios diferentes. Mejor para audiencias establecidas."),
-    ("GitHub Sponsors", "github.com/sponsors", "Perfecto si tu audiencia es tecnica. Sin comisiones de procesamiento. Ideal para proyectos open source.")
-]
-
-for name, url, desc in donation_platforms:
-    story.append(Paragraph(f"<b>{name}</b> ({url})", list_style))
-    story.append(Paragraph(desc, list_style))
-    story.append(Spacer(1, 8))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Como configurar Ko-fi (recomendado para empezar):</b>", heading2_style))
-
-steps_kofi = [
-    ("Paso 1", "Ve a ko-fi.com y crea una cuenta gratuita usando tu email o cuenta de redes sociales."),
-    ("Paso 2", "Personaliza tu pagina con tu foto de perfil, banner y una descripcion clara de lo que haces."),
-    ("Paso 3", "Conecta tu cuenta de PayPal o Stripe para recibir los pagos directamente."),
-    ("Paso 4", "Crea tu link unico (ejemplo: ko-fi.com/megia) y agregalo a tu Link Hub."),
-    ("Paso 5", "Configura metas de financiamiento para motivar a tus seguidores a apoyarte.")
-]
-
-for step, desc in steps_kofi:
-    story.append(Paragraph(f"<b>{step}:</b> {desc}", list_style))
-    story.append(Spacer(1, 6))
-
-story.append(PageBreak())
-
-# Section 4: Premium Content
-story.append(Paragraph("4. Contenido Premium - Ingresos Recurrentes", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Que contenido premium puedes ofrecer?</b>", heading2_style))
-story.append(Paragraph(
-    "El contenido premium es informacion o recursos exclusivos que tus seguidores mas comprometidos estan dispuestos a pagar. Como creador de contenido sobre IA, tienes muchas opciones valiosas que puedes monetizar. La clave es ofrecer algo que no este disponible gratuitamente en otro lugar y que proporcione un valor real y tangible a tu audiencia.",
-    body_style
-))
-
-premium_ideas = [
-    "Plantillas de prompts probados y optimizados para diferentes herramientas de IA como ChatGPT, Claude, Midjourney",
-    "Acceso anticipado a tus videos y contenido antes de que se publique publicamente",
-    "Tutoriales exclusivos paso a paso sobre herramientas especificas de IA",
-    "Comunidad privada de Discord con acceso directo a ti y networking con otros profesionales",
-    "Consultas grupales mensuales donde respondes preguntas en vivo",
-    "Newsletter semanal exclusivo con noticias curadas y analisis profundo de tendencias en IA",
-    "Descargas exclusivas como guias en PDF, cheatsheets y listas de recursos verificados",
-    "Descuentos en cursos o productos de tus colaboradores y afiliados"
-]
-
-for idea in premium_ideas:
-    story.append(Paragraph(f"- {idea}", list_style))
-    story.append(Spacer(1, 4))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Plataformas para vender contenido premium:</b>", heading2_style))
-
-premium_platforms = [
-    ("Gumroad", "gumroad.com", "Perfecto para productos digitales individuales como ebooks, cursos o templates. Facil de configurar."),
-    ("Patreon", "patreon.com", "Ideal para membresias mensuales con contenido exclusivo continuo."),
-    ("Substack", "substack.com", "Especializado en newsletters pagados. Muy popular para contenido escrito."),
-    ("Teachable", "teachable.com", "Mejor para cursos completos con video y materiales descargables."),
-    ("Hotmart", "hotmart.com", "Popular en hispanoamerica. Permite cursos, membresias y productos digitales.")
+catalog_header = tuple(CONTENT['catalog']['header'])
+catalog_title = CONTENT['catalog']['title']
+
+# Anything here can be overridden per render, including the content lists
+# (guide_content.CONTENT_KEYS) from guide_content.json
+DEFAULT_CONFIG = {
+    'output': DEFAULT_OUTPUT,
+    **{key: CONTENT['meta'][key] for key in META_KEYS},
+    # Optional iterable of tool dicts (name, category, pricing, rating) added
+    # as an appendix; it is consumed lazily while the pages are laid out
+    'catalog': None,
+    'catalog_chunk_rows': 40,
+    # Render section by section and reuse unchanged sections from this
+    # directory (e.g. guide_cache.SECTION_CACHE_DIR) instead of laying out
+    # everything
+    'cache_dir': None,
+    'cache_max_bytes': 64 * 1024 * 1024,
+    # Lay the sections out in this many processes and merge the results;
+    # the catalog is split into parts of catalog_part_rows rows
+    'workers': None,
+    'catalog_part_rows': 1000,
+    # Renders with a catalog are merged from parts too: ReportLab holds
+    # every page of a document until it is saved, so the catalog is laid
+    # out catalog_part_pages pages per PDF, each picking up where the last
+    # one broke off
+    'catalog_part_pages': 50,
+    # Optional image (e.g. download/megia-avatar.png) shown on the cover
+    'cover_image': None,
+    # Smaller files: only the glyphs actually drawn are embedded, objects
+    # are packed into compressed object streams and images are resampled
+    # to image_dpi. Applies to sectioned and parallel renders too: their
+    # parts share subsets seeded with the glyphs the guide draws
+    # (subset_seeds) and are merged into object streams.
+    'compact': False,
+    'image_dpi': DEFAULT_IMAGE_DPI,
+}
+
+COVER_IMAGE_SIZE = 4*cm
+
+
+def build_styles():
+    styles = {}
+
+    styles['title'] = ParagraphStyle(
+        name='TitleStyle',
+        fontName='SimHei',
+        fontSize=28,
+        leading=36,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#6366f1'),
+        spaceAfter=20
+    )
+
+    styles['brand'] = ParagraphStyle(
+        name='BrandName',
+        fontName='SimHei',
+        fontSize=36,
+        leading=44,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#8b5cf6')
+    )
+
+    styles['subtitle'] = ParagraphStyle(
+        name='Subtitle',
+        fontName='SimHei',
+        fontSize=16,
+        leading=22,
+        alignment=TA_CENTER,
+        textColor=colors.gray
+    )
+
+    styles['year'] = ParagraphStyle(
+        name='Year',
+        fontName='Times New Roman',
+        fontSize=14,
+        alignment=TA_CENTER,
+        textColor=colors.gray
+    )
+
+    styles['heading1'] = ParagraphStyle(
+        name='Heading1Style',
+        fontName='SimHei',
+        fontSize=18,
+        leading=24,
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#6366f1'),
+        spaceBefore=20,
+        spaceAfter=12,
+        leftIndent=0
+    )
+
+    styles['heading2'] = ParagraphStyle(
+        name='Heading2Style',
+        fontName='SimHei',
+        fontSize=14,
+        leading=20,
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#8b5cf6'),
+        spaceBefore=15,
+        spaceAfter=8
+    )
+
+    styles['body'] = ParagraphStyle(
+        name='BodyStyle',
+        fontName='SimHei',
+        fontSize=11,
+        leading=18,
+        alignment=TA_LEFT,
+        spaceBefore=6,
+        spaceAfter=6,
+        wordWrap='CJK'
+    )
+
+    styles['list'] = ParagraphStyle(
+        name='ListStyle',
+        fontName='SimHei',
+        fontSize=11,
+        leading=18,
+        alignment=TA_LEFT,
+        leftIndent=20,
+        spaceBefore=4,
+        spaceAfter=4,
+        wordWrap='CJK'
+    )
+
+    styles['highlight'] = ParagraphStyle(
+        name='HighlightStyle',
+        fontName='SimHei',
+        fontSize=11,
+        leading=18,
+        alignment=TA_LEFT,
+        backColor=colors.HexColor('#f0f9ff'),
+        leftIndent=10,
+        rightIndent=10,
+        spaceBefore=8,
+        spaceAfter=8,
+        wordWrap='CJK'
+    )
+
+    styles['table_header'] = ParagraphStyle(
+        name='TableHeader',
+        fontName='SimHei',
+        fontSize=10,
+        textColor=colors.white,
+        alignment=TA_CENTER
+    )
+
+    styles['table_cell'] = ParagraphStyle(
+        name='TableCell',
+        fontName='SimHei',
+        fontSize=9,
+        alignment=TA_CENTER,
+        wordWrap='CJK'
+    )
+
+    return styles
+
+
+_styles = None
+
+
+def get_styles():
+    # Styles are immutable once built, so each process builds them once
+    global _styles
+    if _styles is None:
+        _styles = build_styles()
+    return _styles
+
+
+def _cover(cfg, st):
+    story = []
+    story.append(Spacer(1, 100))
+    story.append(Paragraph(escape(cfg['title']), st['title']))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(escape(cfg['brand']), st['brand']))
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(escape(cfg['subtitle']), st['subtitle']))
+    story.append(Spacer(1, 50))
+    story.append(Paragraph(escape(cfg['year']), st['year']))
+    if cfg['cover_image']:
+        story.append(Spacer(1, 40))
+        if cfg['compact']:
+            story.append(downsampled_image(cfg['cover_image'], COVER_IMAGE_SIZE, COVER_IMAGE_SIZE, cfg['image_dpi']))
+        else:
+            story.append(Image(cfg['cover_image'], width=COVER_IMAGE_SIZE, height=COVER_IMAGE_SIZE))
+    return story
+
+
+def _table_of_contents(cfg, st):
+    story = []
+    story.append(Paragraph(escape(CONTENT['toc_title']), st['heading1']))
+    story.append(Spacer(1, 20))
+    for key, item in toc_entries(cfg):
+        story.append(TocLine(escape(item), st['body'], key))
+        story.append(Spacer(1, 8))
+    return story
+
+
+def _section(cfg, st, name):
+    # A section of guide_content.json, block by block. Config values are
+    # plain text, so they are escaped before ReportLab parses the markup.
+    section = get_section(name)
+    story = [Paragraph(escape(section['title']), st['heading1'])]
+    for kind, *block in iter_blocks(section, cfg, escape=escape):
+        if kind == 'space':
+            story.append(Spacer(1, block[0]))
+        elif kind == 'heading':
+            story.append(Paragraph(f"<b>{block[0]}</b>", st['heading2']))
+        elif kind in ('paragraph', 'highlight'):
+            story.append(Paragraph(block[0], st['body' if kind == 'paragraph' else 'highlight']))
+        elif kind == 'list':
+            items, marker, space = block
+            for lines in items:
+                for line in lines:
+                    story.append(Paragraph(f"{marker} {line}" if marker else line, st['list']))
+                story.append(Spacer(1, space))
+        elif kind == 'table':
+            header, rows, widths, padding = block
+            story.append(build_table(header, rows, [w*cm for w in widths], st['table_cell'], padding=padding))
+    return story
+
+
+def _section_catalog(cfg, st):
+    yield Paragraph(escape(catalog_title), st['heading1'])
+    yield Spacer(1, 15)
+    yield from _section_catalog_more(cfg, st)
+
+
+def _section_catalog_more(cfg, st):
+    # One small table per chunk keeps split costs and live objects bounded
+    rows = ([escape(c) for c in row] for row in catalog_rows(cfg['catalog']))
+    chunk_rows = cfg['catalog_chunk_rows']
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        yield build_table(catalog_header, chunk, [6*cm, 3.5*cm, 3*cm, 2.5*cm], st['table_cell'],
+                          padding=4, repeat_rows=1, cache=False)
+
+
+# Each section starts on its own page
+SECTIONS = [
+    ('cover', _cover),
+    ('toc', _table_of_contents),
+    *((section['key'], partial(_section, name=section['key'])) for section in CONTENT['sections']),
 ]
 
-for name, url, desc in premium_platforms:
-    story.append(Paragraph(f"<b>{name}</b> - {desc}", list_style))
-    story.append(Spacer(1, 6))
-
-story.append(PageBreak())
-
-# Section 5: Sponsorships
-story.append(Paragraph("5. Patrocinios - Colaboraciones con Marcas", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Como conseguir patrocinadores?</b>", heading2_style))
-story.append(Paragraph(
-    "Los patrocinios son acuerdos donde las marcas te pagan por promocionar sus productos o servicios a tu audiencia. A diferencia de los afiliados, aqui recibes un pago fijo independientemente de las ventas que generes. Para conseguir patrocinadores, primero necesitas construir una audiencia y demostrar valor. Las marcas buscan creadores con engagement real, no solo numeros inflados.",
-    body_style
-))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Plataformas para conectar con marcas:</b>", heading2_style))
-
-sponsor_platforms = [
-    ("Influencer Marketing Hub", "influencermarketinghub.com", "Directorio y recursos para encontrar colaboraciones"),
-    ("AspireIQ", "aspireiq.com", "Plataforma profesional de marketing de influencia"),
-    ("GRIN", "grin.co", "Herramienta para gestionar relaciones con influencer"),
-    ("Social Blade", "socialblade.com", "Analytics para demostrar tu crecimiento a marcas")
-]
-
-for name, url, desc in sponsor_platforms:
-    story.append(Paragraph(f"- <b>{name}</b>: {desc}", list_style))
-    story.append(Spacer(1, 4))
-
-story.append(Spacer(1, 15))
-story.append(Paragraph("<b>Consejos para conseguir tu primer patrocinador:</b>", heading2_style))
-
-sponsor_tips = [
-    "Construye primero - necesitas al menos 5,000-10,000 seguidores activos para ser atractivo",
-    "Documenta todo - guarda capturas de tus estadisticas, engagement y comentarios positivos",
-    "Crea un media kit - un PDF profesional con tu informacion, estadisticas y lo que ofreces",
-    "Comienza pequeno - contacta startups y herramientas de IA emergentes que busquen exposicion",
-    "Soy profesional - trata cada interaccion como una propuesta de negocios formal",
-    "Cumple lo prometido - entrega mas de lo acordado para conseguir recompras"
-]
-
-for tip in sponsor_tips:
-    story.append(Paragraph(f"- {tip}", list_style))
-    story.append(Spacer(1, 4))
-
-story.append(PageBreak())
-
-# Section 6: Summary
-story.append(Paragraph("6. Resumen y Plan de Accion", heading1_style))
-story.append(Spacer(1, 15))
-
-story.append(Paragraph("<b>Tu plan de monetizacion para los proximos 30 dias:</b>", heading2_style))
-
-plan_data = [
-    [Paragraph('<b>Semana</b>', header_style_tbl), Paragraph('<b>Acciones</b>', header_style_tbl), Paragraph('<b>Objetivo</b>', header_style_tbl)],
-    [Paragraph('Semana 1', cell_style_tbl), Paragraph('Crear cuenta AdSense y Ko-fi', cell_style_tbl), Paragraph('Configurar bases', cell_style_tbl)],
-    [Paragraph('Semana 2', cell_style_tbl), Paragraph('Registrarse en Amazon Associates', cell_style_tbl), Paragraph('Primeros links de afiliado', cell_style_tbl)],
-    [Paragraph('Semana 3', cell_style_tbl), Paragraph('Completar perfil en todas las redes', cell_style_tbl), Paragraph('Aumentar trafico', cell_style_tbl)],
-    [Paragraph('Semana 4', cell_style_tbl), Paragraph('Crear contenido premium basico', cell_style_tbl), Paragraph('Primera oferta de valor', cell_style_tbl)],
-]
-
-plan_table = Table(plan_data, colWidths=[3*cm, 6*cm, 4*cm])
-plan_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
-    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('FONTNAME', (0, 0), (-1, -1), 'SimHei'),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-    ('TOPPADDING', (0, 0), (-1, -1), 10),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-]))
-story.append(plan_table)
-
-story.append(Spacer(1, 20))
-story.append(Paragraph("<b>Links importantes para empezar:</b>", heading2_style))
-
-links = [
-    "Google AdSense: www.google.com/adsense",
-    "Amazon Associates: affiliate-program.amazon.com",
-    "Ko-fi: ko-fi.com",
-    "Buy Me a Coffee: buymeacoffee.com",
-    "Coursera Afiliados: about.coursera.org/affiliates",
-    "Gumroad: gumroad.com"
-]
+# Config keys each section reads; the catalog isn't listed because it is a
+# one-shot iterator and can't be hashed without consuming it
+SECTION_INPUTS = {
+    'cover': ('title', 'brand', 'subtitle', 'year', 'cover_image', 'image_dpi'),
+    'toc': ('toc_items',),
+    **{section['key']: section_inputs(section) for section in CONTENT['sections']},
+}
+
+
+def resolve_config(config=None):
+    cfg = dict(DEFAULT_CONFIG)
+    cfg.update(content_config())
+    if config:
+        cfg.update(config)
+    return cfg
+
+
+def iter_sections(cfg):
+    yield from SECTIONS
+    if cfg['catalog'] is not None:
+        yield ('catalog', _section_catalog)
 
-for link in links:
-    story.append(Paragraph(f"- {link}", list_style))
-    story.append(Spacer(1, 4))
 
-story.append(Spacer(1, 30))
-story.append(Paragraph(
-    "Tu Link Hub de MEG.IA ya esta preparado con todos los espacios necesarios para monetizar. Solo necesitas registrar tus cuentas, obtener tus enlaces y actualizarlos en la web. El exito viene con consistencia y valor real para tu audiencia.",
-    highlight_style
-))
+def toc_entries(cfg):
+    # (section name, TOC text) pairs
+    entries = list(zip(TOC_SECTIONS, cfg['toc_items']))
+    if cfg['catalog'] is not None:
+        entries.append(('catalog', catalog_title))
+    return entries
 
-# Build PDF
-doc.build(story)
-print("PDF generado exitosamente!")
+
+def iter_story(cfg, st, trace=None):
+    titles = dict(toc_entries(cfg))
+    for i, (name, section) in enumerate(iter_sections(cfg)):
+        if i:
+            yield PageBreak()
+        if trace is not None:
+            yield trace.mark(name)
+        if name in titles:
+            yield SectionAnchor(name, titles[name], st['body'].fontName, st['body'].fontSize)
+        yield from section(cfg, st)
+
+
+def build_story(cfg, st, trace=None):
+    return list(iter_story(cfg, st, trace))
+
+
+def _doc_info(cfg):
+    return {
+        'Title': CONTENT['meta']['document_title'].format_map(cfg),
+        'Author': cfg['author'],
+        'Creator': cfg['author'],
+        'Subject': cfg['subject'],
+    }
+
+
+def _build(target, cfg, flowables, trace=None, seeds=None, canvasmaker=Canvas, max_pages=None):
+    # flowables may be a FlowableStream shared between builds; with
+    # max_pages the build stops at the first page break after that many
+    # pages and leaves the rest of the stream for the next one
+    info = _doc_info(cfg)
+    doc = SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        title=info['Title'],
+        author=info['Author'],
+        creator=info['Creator'],
+        subject=info['Subject'],
+        pageCompression=1 if cfg['compact'] else None,
+    )
+    if trace is not None:
+        canvasmaker = trace.canvasmaker()
+    if seeds is not None:
+        # Parts of a merged document: identical font subsets dedupe
+        base = canvasmaker
+
+        def canvasmaker(*args, **kwargs):
+            canv = base(*args, **kwargs)
+            share_subsets(canv._doc, seeds)
+            return canv
+
+    stream = flowables if isinstance(flowables, FlowableStream) else FlowableStream(flowables)
+    if max_pages is not None:
+        stream.stop_after(doc, max_pages)
+    try:
+        with compact_settings() if cfg['compact'] else nullcontext(), cached_measurement():
+            doc.build(stream, canvasmaker=canvasmaker)
+    finally:
+        stream.stop_after(None, None)
+
+
+class _CharProbe(Canvas):
+    # Records the characters each guide font drew before the fonts are saved
+    chars = None
+
+    def save(self):
+        _CharProbe.chars = document_chars(self._doc)
+        Canvas.save(self)
+
+
+def _file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _font_digests():
+    return tuple((name, font_digest(name)) for name in sorted(FONT_FILES))
+
+
+_styles_digest = None
+
+
+def _get_styles_digest():
+    global _styles_digest
+    if _styles_digest is None:
+        _styles_digest = styles_fingerprint(get_styles())
+    return _styles_digest
+
+
+_subset_seeds = None
+
+
+def subset_seeds():
+    # The characters each font draws in the default guide, which seed the
+    # shared font subsets of separately rendered parts. Found by laying the
+    # default guide out in compact mode, where only drawn characters get
+    # codes, and kept on disk so a new process doesn't repeat that layout;
+    # anything else a part draws goes to a subset of its own.
+    global _subset_seeds
+    if _subset_seeds is None:
+        key = seeds_key(_font_digests(), _file_digest(CONTENT_PATH), _get_styles_digest())
+        path = os.path.join(SEED_CACHE_DIR, f'{key}.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                _subset_seeds = json.load(f)
+        except (OSError, ValueError):
+            cfg = resolve_config({'output': None, 'compact': True})
+            _build(io.BytesIO(), cfg, iter_story(cfg, get_styles()), canvasmaker=_CharProbe)
+            _subset_seeds = _CharProbe.chars
+            write_atomic(path, json.dumps(_subset_seeds, ensure_ascii=False).encode('utf-8'))
+    return _subset_seeds
+
+
+def _render_part(section, cfg, seeds):
+    # Runs in a pool worker for parallel renders
+    buf = io.BytesIO()
+    _build(buf, cfg, section(cfg, get_styles()), seeds=seeds)
+    return buf.getvalue()
+
+
+def _iter_parts(cfg, split_catalog):
+    # (name, section, config) per separately rendered PDF. For parallel
+    # renders the catalog is materialized in parts so each can be shipped
+    # to a worker.
+    for name, section in iter_sections(cfg):
+        if not split_catalog:
+            yield name, section, cfg
+            continue
+        if name != 'catalog':
+            yield name, section, dict(cfg, catalog=None)
+            continue
+        rows = iter(cfg['catalog'])
+        part = 1
+        while True:
+            chunk = list(islice(rows, cfg['catalog_part_rows']))
+            if not chunk and part > 1:
+                break
+            yield (name if part == 1 else f'{name}-{part}',
+                   _section_catalog if part == 1 else _section_catalog_more,
+                   dict(cfg, catalog=chunk))
+            part += 1
+
+
+def _section_parts(cfg, seeds, cache=None, trace=None, pool=None):
+    # Returns the section PDFs in document order plus the outline entries
+    # as (title, page index) pairs. Parts are laid out in pool when given.
+    st = get_styles()
+    styles_digest = _get_styles_digest()
+    # Font and image files are keyed by content, so replacing one in place
+    # invalidates the parts drawn with it
+    fonts = (_font_digests(), tuple(sorted(seeds.items())))
+
+    def part_key(name, section, extra=()):
+        if cache is None or name not in SECTION_INPUTS:
+            return None
+        inputs = [cfg[k] for k in SECTION_INPUTS[name]]
+        if 'cover_image' in SECTION_INPUTS[name] and cfg['cover_image']:
+            inputs.append(_file_digest(cfg['cover_image']))
+        if name in TOC_SECTIONS:
+            # The section's blocks in guide_content.json
+            inputs.append(get_section(name))
+        return section_key(name, section, inputs, styles_digest, (fonts, cfg['compact'], *extra))
+
+    def cached(name, key):
+        data = cache.get(key) if key is not None else None
+        if data is not None and trace is not None:
+            trace.cached(name, count_pages(data))
+        return data
+
+    def render(name, key, flowables, part_cfg=cfg):
+        if trace is not None:
+            flowables = chain([trace.mark(name)], flowables)
+        buf = io.BytesIO()
+        _build(buf, part_cfg, flowables, trace, seeds)
+        data = buf.getvalue()
+        if key is not None:
+            cache.put(key, data)
+        return [data]
+
+    def render_paged(name, flowables, part_cfg):
+        # The pages break exactly as in one document, but ReportLab only
+        # ever holds catalog_part_pages of them
+        if trace is not None:
+            flowables = chain([trace.mark(name)], flowables)
+        stream = FlowableStream(flowables)
+        datas = []
+        while not datas or stream:
+            if trace is not None and datas:
+                trace.resume()
+            buf = io.BytesIO()
+            _build(buf, part_cfg, stream, trace, seeds, max_pages=cfg['catalog_part_pages'])
+            datas.append(buf.getvalue())
+        return datas
+
+    # Parts are lists of PDFs: the in-process catalog is several
+    specs = list(_iter_parts(cfg, split_catalog=pool is not None))
+    parts = {}
+    pending = {}
+    for name, section, part_cfg in specs:
+        if name == 'toc':
+            continue
+        key = part_key(name, section)
+        data = cached(name, key)
+        if data is not None:
+            parts[name] = [data]
+        elif pool is not None:
+            pending[name] = (key, pool.submit(_render_part, section, part_cfg, seeds))
+        elif name == 'catalog':
+            parts[name] = render_paged(name, section(part_cfg, st), part_cfg)
+        else:
+            parts[name] = render(name, key, section(part_cfg, st), part_cfg)
+    for name, (key, future) in pending.items():
+        parts[name] = [future.result()]
+        if key is not None:
+            cache.put(key, parts[name][0])
+    pages = {name: sum(map(count_pages, datas)) for name, datas in parts.items()}
+
+    # The TOC goes last: its page numbers depend on every other part's
+    # length, and the TOC's own length is only known once it is laid out
+    entries = toc_entries(cfg)
+    names = [name for name, _, _ in specs]
+
+    def first_pages(toc_pages):
+        first = {}
+        page = 1
+        for name in names:
+            first[name] = page
+            page += toc_pages if name == 'toc' else pages[name]
+        return {key: first[key] for key, _ in entries}
+
+    toc = dict(SECTIONS).get('toc') if 'toc' in names else None
+    if toc is not None:
+        body = st['body']
+        numbers = PageNumberForms(first_pages, body.fontName, body.fontSize)
+        key = part_key('toc', toc, (tuple(entries), tuple(pages.items())))
+        data = cached('toc', key)
+        parts['toc'] = [data] if data is not None else render('toc', key, [*toc(cfg, st), numbers])
+        pages['toc'] = count_pages(parts['toc'][0])
+        if trace is not None:
+            trace.reorder(names)
+
+    first = first_pages(pages.get('toc', 0))
+    outline = [(title, first[key] - 1) for key, title in entries]
+    return [data for name in names for data in parts[name]], outline
+
+
+def render_guide(config=None, trace=None):
+    # Returns the output path, or the PDF bytes when config['output'] is None.
+    # Pass a guide_trace.LayoutTrace to record per-section layout costs.
+    cfg = resolve_config(config)
+    output = cfg['output']
+
+    # Tracing patches this process, so traced renders stay in it
+    workers = cfg['workers'] if trace is None else None
+    if cfg['cache_dir'] or workers or cfg['catalog'] is not None:
+        cache = SectionCache(cfg['cache_dir'], cfg['cache_max_bytes']) if cfg['cache_dir'] else None
+        seeds = subset_seeds()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else nullcontext()
+        with trace if trace is not None else nullcontext(), pool:
+            parts, outline = _section_parts(cfg, seeds, cache, trace, pool if workers else None)
+            data = merge_pdfs(parts, _doc_info(cfg), outline, object_streams=cfg['compact'])
+    else:
+        buf = io.BytesIO()
+        with trace if trace is not None else nullcontext():
+            _build(buf, cfg, iter_story(cfg, get_styles(), trace), trace)
+        data = buf.getvalue()
+        if cfg['compact']:
+            data = compact_pdf(data)
+
+    if output is None:
+        return data
+    # Built in memory and swapped in whole, so the site never serves a
+    # half-written PDF
+    write_atomic(output, data)
+    return output
+
+
+def _init_worker():
+    # Pay for fonts and styles once per worker instead of once per PDF
+    ensure_fonts()
+    get_styles()
+
+
+def render_batch(configs, workers=None, chunksize=4):
+    # Results come back in the same order as configs: the PDF bytes, or the
+    # path for configs that name their own output. Configs never fall back
+    # to DEFAULT_OUTPUT, and two of them may not write the same file.
+    configs = [{'output': None, **config} for config in configs]
+    outputs = [os.path.abspath(config['output']) for config in configs if config['output'] is not None]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError('render_batch: several configs write the same output file')
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(render_guide, configs, chunksize=chunksize))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace', metavar='FILE', help='write a per-section layout trace (JSON) to FILE')
+    parser.add_argument('--catalog-db', metavar='DB', help='append the tool catalog from a tools_catalog.py store')
+    parser.add_argument('--cover-image', metavar='IMAGE', help='image shown on the cover')
+    parser.add_argument('--compact', action='store_true', help='smallest output: used glyphs only, object streams, resampled images')
+    parser.add_argument('--image-dpi', type=int, default=DEFAULT_IMAGE_DPI, help='image resolution in --compact mode')
+    parser.add_argument('--cache-dir', nargs='?', const=SECTION_CACHE_DIR, metavar='DIR',
+                        help=f'reuse unchanged sections from DIR (default: {SECTION_CACHE_DIR})')
+    parser.add_argument('--workers', type=int, help='lay the sections out in this many processes')
+    args = parser.parse_args()
+
+    config = {'cover_image': args.cover_image, 'compact': args.compact, 'image_dpi': args.image_dpi,
+              'cache_dir': args.cache_dir, 'workers': args.workers}
+    if args.catalog_db:
+        from tools_catalog import iter_tools
+        config['catalog'] = iter_tools(args.catalog_db)
+
+    trace = None
+    if args.trace:
+        from guide_trace import LayoutTrace
+        trace = LayoutTrace()
+    render_guide(config, trace=trace)
+    if trace is not None:
+        trace.write(args.trace)
+    print("PDF generado exitosamente!")
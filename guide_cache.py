@@ -0,0 +1,123 @@
+from guide_fonts import CACHE_ROOT
+from atomic_files import write_atomic
+from reportlab import Version as REPORTLAB_VERSION
+from types import CodeType, FunctionType
+import hashlib
+import os
+
+SECTION_CACHE_DIR = os.path.join(CACHE_ROOT, 'sections')
+SEED_CACHE_DIR = os.path.join(CACHE_ROOT, 'seeds')
+
+# Bump when a change outside the section functions alters their layout
+LAYOUT_VERSION = 4
+
+
+def _code_fingerprint(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _code_fingerprint(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def function_fingerprint(fn, digest, seen=None):
+    # Covers the function and every helper it calls from this module or the
+    # guide_* modules, so editing other sections' code or content doesn't
+    # invalidate the key
+    seen = set() if seen is None else seen
+    if fn in seen:
+        return
+    seen.add(fn)
+    _code_fingerprint(fn.__code__, digest)
+    names = []
+    pending = [fn.__code__]
+    while pending:
+        code = pending.pop()
+        names.extend(code.co_names)
+        pending.extend(c for c in code.co_consts if isinstance(c, CodeType))
+    for name in names:
+        value = fn.__globals__.get(name)
+        if isinstance(value, FunctionType):
+            if value.__module__ == fn.__module__ or value.__module__.startswith('guide_'):
+                function_fingerprint(value, digest, seen)
+        elif isinstance(value, (str, int, float, tuple, list, dict)):
+            # Module constants such as table headers
+            digest.update(repr((name, value)).encode())
+
+
+def styles_fingerprint(styles):
+    digest = hashlib.sha256()
+    for key in sorted(styles):
+        attrs = sorted((k, v) for k, v in styles[key].__dict__.items() if k != 'parent')
+        digest.update(repr((key, attrs)).encode())
+    return digest.hexdigest()
+
+
+def section_key(name, section, inputs, styles_digest, extra=()):
+    digest = hashlib.sha256()
+    digest.update(repr((LAYOUT_VERSION, REPORTLAB_VERSION, name, styles_digest, extra)).encode())
+    # Sections built from guide_content.json are partials of one function
+    function_fingerprint(getattr(section, 'func', section), digest)
+    digest.update(repr(inputs).encode())
+    return digest.hexdigest()
+
+
+def seeds_key(fonts, content_digest, styles_digest):
+    # Subset seeds follow the font files, guide_content.json and the layout;
+    # stale seeds only cost file size, never correctness
+    digest = hashlib.sha256()
+    digest.update(repr((LAYOUT_VERSION, REPORTLAB_VERSION, fonts, content_digest, styles_digest)).encode())
+    return digest.hexdigest()
+
+
+class SectionCache:
+    # Rendered section PDFs on disk, one file per content hash. The file
+    # mtime doubles as the LRU clock; puts evict the oldest entries once the
+    # directory grows past max_bytes.
+
+    def __init__(self, directory=SECTION_CACHE_DIR, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process since the read; the bytes are good
+            pass
+        return data
+
+    def put(self, key, data):
+        write_atomic(self._path(key), data)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.pdf'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
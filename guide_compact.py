@@ -0,0 +1,52 @@
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import Image
+from guide_fonts import FONT_FILES, ensure_fonts
+from contextlib import contextmanager
+import io
+
+# Helpers for the compact output mode. ReportLab always embeds the 96
+# printable ASCII glyphs of a TrueType font so that content streams stay
+# readable, and ASCII85-encodes every stream (+25%) so the file is 7-bit
+# clean; compact renders turn both off. Images are resampled to the
+# resolution they are printed at.
+
+DEFAULT_IMAGE_DPI = 150
+
+
+@contextmanager
+def compact_settings():
+    # ReportLab reads these from the font objects and rl_config while it
+    # builds and saves, so they are switched for the duration of one build
+    # and restored afterwards
+    ensure_fonts()
+    fonts = [pdfmetrics.getFont(name) for name in FONT_FILES]
+    saved = [font._asciiReadable for font in fonts], rl_config.useA85
+    for font in fonts:
+        font._asciiReadable = 0
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        for font, flag in zip(fonts, saved[0]):
+            font._asciiReadable = flag
+        rl_config.useA85 = saved[1]
+
+
+def downsampled_image(path, width, height, dpi=DEFAULT_IMAGE_DPI):
+    # width/height in points; the image is never upsampled
+    from PIL import Image as PILImage
+
+    with PILImage.open(path) as img:
+        # Photos stay JPEG; anything with transparency stays lossless
+        lossless = img.format != 'JPEG' and ('A' in img.getbands() or 'transparency' in img.info)
+        size = (max(1, round(width / 72 * dpi)), max(1, round(height / 72 * dpi)))
+        if img.width > size[0] or img.height > size[1]:
+            img = img.resize(size, PILImage.LANCZOS)
+        buf = io.BytesIO()
+        if lossless:
+            img.save(buf, format='PNG', optimize=True)
+        else:
+            img.convert('RGB').save(buf, format='JPEG', quality=85, optimize=True)
+    buf.seek(0)
+    return Image(buf, width=width, height=height)
@@ -0,0 +1,124 @@
+from functools import lru_cache
+import json
+import os
+import string
+
+# The guide's content as data. guide_content.json holds the cover metadata,
+# the content lists (steps, tips, platforms, tables) and each section as an
+# ordered list of blocks; the PDF, HTML and Markdown renderers walk the same
+# blocks. Block texts and list item templates are ReportLab paragraph
+# markup (only <b> is used, entities escaped); {name} fields are filled from
+# the render config and item templates take the item's values as {0},
+# {1}, ... Config values, titles and table headers are plain text in every
+# format. Stdlib only, so the lightweight formats never import ReportLab.
+#
+#   {"type": "heading" | "paragraph" | "highlight", "text": ...}
+#   {"type": "list", "items": <list key>, "item": template or [templates],
+#    "space": pt after each item, "marker": optional prefix}
+#   {"type": "table", "rows": <list key>, "header": [...], "widths_cm": [...], "padding": pt}
+#   {"type": "space", "height": pt}     (vertical space, PDF only)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CONTENT_PATH = os.path.join(ROOT, 'guide_content.json')
+CONTENT_FORMAT = 1
+
+META_KEYS = ('brand', 'title', 'subtitle', 'year', 'author', 'subject')
+
+_formatter = string.Formatter()
+
+
+@lru_cache(maxsize=None)
+def load_content(path=CONTENT_PATH):
+    # Parsed once per process; treat the result as read-only
+    with open(path, encoding='utf-8') as f:
+        content = json.load(f)
+    if content.get('format') != CONTENT_FORMAT:
+        raise ValueError(f"{path}: unsupported content format {content.get('format')!r}")
+    return content
+
+
+CONTENT = load_content()
+
+# Config keys holding content lists; each can be overridden per render
+CONTENT_KEYS = (*CONTENT['lists'], 'toc_items')
+
+# Sections listed in the table of contents, in toc_items order
+TOC_SECTIONS = tuple(section['key'] for section in CONTENT['sections'])
+
+
+def content_config(content=CONTENT):
+    # Cover metadata and content lists as config defaults. The TOC lists
+    # the section titles unless toc_items is overridden.
+    cfg = {key: content['meta'][key] for key in META_KEYS}
+    cfg.update(content['lists'])
+    cfg['toc_items'] = [section['title'] for section in content['sections']]
+    return cfg
+
+
+def get_section(name, content=CONTENT):
+    for section in content['sections']:
+        if section['key'] == name:
+            return section
+    raise KeyError(name)
+
+
+def section_inputs(section):
+    # Config keys a section's blocks read: the lists they iterate and the
+    # {fields} in their texts
+    keys = []
+    for block in section['blocks']:
+        if block['type'] == 'list':
+            keys.append(block['items'])
+        elif block['type'] == 'table':
+            keys.append(block['rows'])
+        elif 'text' in block:
+            keys.extend(field for _, field, _, _ in _formatter.parse(block['text']) if field)
+    return tuple(dict.fromkeys(keys))
+
+
+def _plain(text):
+    return text
+
+
+def _values(item):
+    return item if isinstance(item, (list, tuple)) else (item,)
+
+
+def iter_blocks(section, cfg, markup=_plain, escape=_plain):
+    # Yields the section's blocks with texts filled in for one output
+    # format: markup converts the model's markup, escape quotes config values
+    # for it. Table headers are yielded as plain text.
+    #   ('heading' | 'paragraph' | 'highlight', text)
+    #   ('list', [[line, ...] per item], marker, space)
+    #   ('table', header, rows, widths_cm, padding)
+    #   ('space', height)
+    fields = None
+    for block in section['blocks']:
+        kind = block['type']
+        if kind == 'space':
+            yield kind, block['height']
+        elif kind in ('heading', 'paragraph', 'highlight'):
+            text = markup(block['text'])
+            if '{' in text:
+                if fields is None:
+                    fields = {key: escape(str(cfg[key])) for key in META_KEYS}
+                text = text.format_map(fields)
+            yield kind, text
+        elif kind == 'list':
+            templates = block['item']
+            templates = [markup(t) for t in (templates if isinstance(templates, list) else [templates])]
+            items = [[t.format(*(escape(str(v)) for v in _values(item))) for t in templates]
+                     for item in cfg[block['items']]]
+            yield kind, items, block.get('marker'), block.get('space', 0)
+        elif kind == 'table':
+            rows = [[escape(str(v)) for v in row] for row in cfg[block['rows']]]
+            yield kind, block['header'], rows, block['widths_cm'], block.get('padding', 8)
+        else:
+            raise ValueError(f"section {section['key']}: unknown block type {kind!r}")
+
+
+def catalog_rows(tools):
+    # (name, category, price, rating) per catalog tool
+    for tool in tools:
+        rating = tool.get('rating')
+        yield (tool['name'], tool['category'], tool['pricing'], f'{rating:.1f}' if rating else '-')
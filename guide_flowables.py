@@ -0,0 +1,159 @@
+from reportlab.platypus import Flowable
+from reportlab.platypus.doctemplate import PageBegin
+from guide_text import GuideParagraph
+from itertools import islice
+
+
+class FlowableStream:
+    # Looks enough like a list for doc.build(), but pulls flowables from an
+    # iterator on demand so the story is never fully materialized. Only the
+    # front of the story is ever touched by the layout loop; `lookahead`
+    # bounds how far keepWithNext chains can see.
+    #
+    # stop_after() ends a build at the first page break after a page count;
+    # the flowables not yet laid out (including the rest of a split table)
+    # stay queued, and building the same stream again continues from there.
+
+    def __init__(self, flowables, lookahead=16):
+        self._source = iter(flowables)
+        self._buffer = []
+        self._lookahead = lookahead
+        self._doc = None
+        self._max_pages = None
+
+    def stop_after(self, doc, pages):
+        # Pass doc=None to lift the limit once the build is done
+        self._doc = doc
+        self._max_pages = pages
+
+    def _page_limit_reached(self):
+        # The layout loop hangs a PageBegin right after finishing a page;
+        # doc.build() takes len() once before the layout starts
+        hanging = getattr(self._doc, '_hanging', None)
+        return bool(hanging) and hanging[-1] is PageBegin and self._doc.page >= self._max_pages
+
+    def _fill(self, n):
+        missing = n - len(self._buffer)
+        if missing > 0 and self._source is not None:
+            self._buffer.extend(islice(self._source, missing))
+            if len(self._buffer) < n:
+                self._source = None
+
+    def __len__(self):
+        if self._page_limit_reached():
+            return 0
+        self._fill(self._lookahead)
+        return len(self._buffer)
+
+    def __bool__(self):
+        self._fill(1)
+        return bool(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._fill(index.stop if index.stop is not None else self._lookahead)
+        else:
+            self._fill(index + 1)
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._fill(index.stop or 0)
+        else:
+            self._fill(index + 1)
+        self._buffer[index] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            self._fill(index.stop or 0)
+        else:
+            self._fill(index + 1)
+        del self._buffer[index]
+
+    def insert(self, index, value):
+        self._buffer.insert(index, value)
+
+
+# Page-numbered table of contents in a single layout pass. Each TOC line
+# draws its page number through a form XObject that doesn't exist yet; the
+# SectionAnchor at the start of the section defines the form once the layout
+# loop reaches it. PDF resolves forms by name at save time, so forward
+# references are fine as long as every form is defined before the canvas is
+# saved.
+
+def page_number_form(key):
+    return f'tocPage-{key}'
+
+
+def define_page_number(canv, key, page, font, size):
+    canv.beginForm(page_number_form(key))
+    canv.setFont(font, size)
+    canv.drawRightString(0, 0, str(page))
+    canv.endForm()
+
+
+class TocLine(GuideParagraph):
+    # A TOC entry with its page number right-aligned on the first line
+
+    def __init__(self, text, style, key, number_width=30):
+        GuideParagraph.__init__(self, text, style)
+        self.key = key
+        self.number_width = number_width
+
+    def wrap(self, availWidth, availHeight):
+        self._line_width = availWidth
+        _, height = GuideParagraph.wrap(self, availWidth - self.number_width, availHeight)
+        return availWidth, height
+
+    def draw(self):
+        GuideParagraph.draw(self)
+        canv = self.canv
+        canv.saveState()
+        canv.translate(self._line_width, self.height - self.style.fontSize)
+        canv.doForm(page_number_form(self.key))
+        canv.restoreState()
+
+
+class SectionAnchor(Flowable):
+    # Zero-size flowable at the top of a section: fills in the section's TOC
+    # page number and adds it to the document outline
+
+    _ZEROSIZE = 1
+
+    def __init__(self, key, title, font, size):
+        Flowable.__init__(self)
+        self.key = key
+        self.title = title
+        self.font = font
+        self.size = size
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        canv = self.canv
+        define_page_number(canv, self.key, canv.getPageNumber(), self.font, self.size)
+        canv.bookmarkPage(self.key)
+        canv.addOutlineEntry(self.title, self.key, level=0)
+
+
+class PageNumberForms(Flowable):
+    # Defines every TOC page number at once, for renders where the sections
+    # are laid out in separate documents. numbers(toc_pages) receives the
+    # page count of the document so far and returns {key: page}.
+
+    _ZEROSIZE = 1
+
+    def __init__(self, numbers, font, size):
+        Flowable.__init__(self)
+        self.numbers = numbers
+        self.font = font
+        self.size = size
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        canv = self.canv
+        for key, page in self.numbers(canv.getPageNumber()).items():
+            define_page_number(canv, key, page, self.font, self.size)
@@ -0,0 +1,166 @@
+from reportlab import rl_config, Version as REPORTLAB_VERSION
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, TTEncoding, unShapedFontGlob
+from reportlab.lib.styles import ParagraphStyle
+from weakref import WeakKeyDictionary
+from atomic_files import write_atomic
+from fnmatch import fnmatch
+import hashlib
+import mmap
+import os
+import pickle
+
+# Fonts used by the guide, registered on first use instead of at import time
+FONT_FILES = {
+    'SimHei': '/usr/share/fonts/truetype/chinese/SimHei.ttf',
+    'Times New Roman': '/usr/share/fonts/truetype/english/Times-New-Roman.ttf',
+}
+
+CACHE_ROOT = os.environ.get(
+    'MEGIA_GUIDE_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'megia-guide')
+)
+FONT_CACHE_DIR = os.path.join(CACHE_ROOT, 'fonts')
+
+# Bump when the layout of the cached face changes
+_CACHE_FORMAT = 1
+
+# Face attributes that can't be pickled or are rebuilt on load
+_TRANSIENT_ATTRS = ('_ttf_data', '_pdfScale')
+
+_checked = set()
+_mapped = {}
+_digests = {}
+
+
+def _map_file(path):
+    # The raw TTF bytes are only needed for subsetting, so they stay mapped
+    # instead of being read into memory on every run
+    if path not in _mapped:
+        f = open(path, 'rb')
+        _mapped[path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _mapped[path][1]
+
+
+def _file_digest(path):
+    if path not in _digests:
+        _digests[path] = hashlib.sha1(_map_file(path)).hexdigest()
+    return _digests[path]
+
+
+def font_digest(name):
+    # SHA-1 of the font's file, for caches that must notice a font being
+    # replaced in place
+    return _file_digest(FONT_FILES[name])
+
+
+def _cache_path(digest):
+    return os.path.join(FONT_CACHE_DIR, f'{digest}-rl{REPORTLAB_VERSION}-v{_CACHE_FORMAT}.pickle')
+
+
+def _pdf_scale(units_per_em):
+    if units_per_em == 1000:
+        return lambda x: x
+    factor = 1000 / units_per_em
+    return lambda x: x * factor
+
+
+def _load_face(path):
+    data = _map_file(path)
+    cache_path = _cache_path(_file_digest(path))
+    try:
+        with open(cache_path, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        state = None
+
+    if state is None:
+        face = TTFontFace(path)
+        state = {k: v for k, v in face.__dict__.items() if k not in _TRANSIENT_ATTRS}
+        write_atomic(cache_path, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    else:
+        face = TTFontFace.__new__(TTFontFace)
+        face.__dict__.update(state)
+
+    face._ttf_data = data
+    face._pdfScale = _pdf_scale(face.unitsPerEm)
+    return face
+
+
+class MappedTTFont(TTFont):
+    # A TTFont whose face reads the memory-mapped file. harfbuzz wants the
+    # font as a real bytes object, so the file is only copied into memory
+    # the first time a paragraph is actually shaped.
+
+    @property
+    def hbFace(self):
+        if self.shapable and not isinstance(self.face._ttf_data, bytes):
+            self.face._ttf_data = bytes(self.face._ttf_data)
+        return TTFont.hbFace.fget(self)
+
+
+def load_font(name, path):
+    font = MappedTTFont.__new__(MappedTTFont)
+    font.fontName = name
+    font.face = _load_face(path)
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    font.shapable = not any(fnmatch(name, g) for g in unShapedFontGlob)
+    return font
+
+
+def ensure_font(name):
+    if name in _checked:
+        return
+    path = FONT_FILES.get(name)
+    if path is not None and name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(load_font(name, path))
+        registerFontFamily(name, normal=name, bold=name)
+    _checked.add(name)
+
+
+def ensure_fonts():
+    for name in FONT_FILES:
+        ensure_font(name)
+
+
+def document_chars(doc):
+    # {font name: the characters it drew, sorted} for a document whose
+    # canvas hasn't been saved yet (saving drops the subset state)
+    chars = {}
+    for name in FONT_FILES:
+        state = pdfmetrics.getFont(name).state.get(doc) if name in _checked else None
+        if state is not None:
+            chars[name] = ''.join(sorted(chr(code) for code in state.assignments if code > 32))
+    return chars
+
+
+def share_subsets(doc, seeds):
+    # Fills subset 0 of each seeded font with the same characters in the
+    # same order (seeds as returned by document_chars), so documents
+    # rendered separately embed byte-identical subset fonts that
+    # guide_merge can store once. Characters outside the seed start a new
+    # subset, which stays private to the document, instead of changing
+    # the shared one.
+    for name, chars in seeds.items():
+        ensure_font(name)
+        font = pdfmetrics.getFont(name)
+        state = font._assignState(doc)
+        font.splitString(chars, doc)
+        state.nextCode = (state.nextCode + 255) & ~255
+
+
+class GuideParagraphStyle(ParagraphStyle):
+    # Registers the style's font the first time anything reads it
+    @property
+    def fontName(self):
+        name = self.__dict__['fontName']
+        if name not in _checked:
+            ensure_font(name)
+        return name
+
+    @fontName.setter
+    def fontName(self, value):
+        self.__dict__['fontName'] = value
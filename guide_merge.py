@@ -0,0 +1,316 @@
+import hashlib
+import re
+import struct
+import zlib
+
+# Small PDF page merger for documents written by ReportLab: plain xref tables,
+# direct /Length values and no object streams. Objects that end up identical
+# after renumbering (shared fonts, resource dictionaries, ...) are written once,
+# and font subsets are renamed after their content so parts never clash.
+
+_REF = re.compile(rb'(\d+) (\d+) R\b')
+_PARENT = re.compile(rb'/Parent \d+ \d+ R')
+_STREAM = re.compile(rb'>>\s*stream\r?\n')
+_PAGE = re.compile(rb'/Type\s*/Page\b')
+_LENGTH = re.compile(rb'/Length (\d+)(?: (\d+) R)?')
+_SUBSET_NAME = re.compile(rb'/(?:BaseFont|FontName)\s*/[A-Z]{6}\+')
+_FONT_FILE = re.compile(rb'/FontFile[23]? (\d+) \d+ R')
+
+
+class PDFMergeError(ValueError):
+    pass
+
+
+def _parse(data):
+    match = re.search(rb'startxref\s+(\d+)', data[-1024:])
+    if not match:
+        raise PDFMergeError('no startxref found')
+    xref_pos = int(match.group(1))
+    if data[xref_pos:xref_pos + 4] != b'xref':
+        raise PDFMergeError('only classic xref tables are supported')
+
+    lines = data[xref_pos:].split(b'\n')
+    start, count = (int(x) for x in lines[1].split())
+    offsets = {}
+    for i in range(count):
+        fields = lines[2 + i].split()
+        if fields[2] == b'n':
+            offsets[start + i] = int(fields[0])
+    trailer = data[data.index(b'trailer', xref_pos):]
+
+    bounds = sorted(offsets.values()) + [xref_pos]
+    next_offset = {bounds[i]: bounds[i + 1] for i in range(len(bounds) - 1)}
+
+    raw = {}
+    for num, offset in offsets.items():
+        body_start = data.index(b'obj', offset) + 3
+        body_end = data.rindex(b'endobj', body_start, next_offset[offset])
+        raw[num] = data[body_start:body_end]
+
+    objects = {}
+    for num, body in raw.items():
+        stream = _STREAM.search(body)
+        if stream is None:
+            objects[num] = (body.strip(), None)
+            continue
+        head = body[:stream.start() + 2]
+        length = _LENGTH.search(head)
+        if length is None:
+            raise PDFMergeError(f'stream object {num} has no /Length')
+        if length.group(2) is not None:
+            size = int(raw[int(length.group(1))].strip())
+        else:
+            size = int(length.group(1))
+        objects[num] = (head.strip(), body[stream.end():stream.end() + size])
+
+    root = int(re.search(rb'/Root (\d+) \d+ R', trailer).group(1))
+    version = data[5:8]
+    return objects, root, version
+
+
+def _retag_subsets(objects):
+    # Subset fonts are named TAG+Font and ReportLab hands out tags per
+    # document, so separately rendered parts reuse AAAAAB+Font for
+    # different glyph sets. The tag is derived from the embedded font
+    # program instead: identical subsets keep one name (and still merge
+    # into one object), different ones never share it.
+    tags = {}
+    for num, (body, _) in objects.items():
+        font_file = _FONT_FILE.search(body)
+        if font_file and _SUBSET_NAME.search(body):
+            digest = hashlib.sha1(objects[int(font_file.group(1))][1] or b'').digest()
+            tags[num] = bytes(ord('A') + b % 26 for b in digest[:6])
+    if not tags:
+        return
+    for num, (body, stream) in objects.items():
+        tag = tags.get(num) or tags.get(_get_ref(body, rb'FontDescriptor'))
+        if tag is not None:
+            body = _SUBSET_NAME.sub(lambda m: m.group(0)[:-7] + tag + b'+', body)
+            objects[num] = (body, stream)
+
+
+def _get_ref(body, key):
+    match = re.search(rb'/' + key + rb' (\d+) \d+ R', body)
+    return int(match.group(1)) if match else None
+
+
+def _page_numbers(objects, node):
+    body = objects[node][0]
+    if re.search(rb'/Type\s*/Pages\b', body):
+        kids = re.search(rb'/Kids\s*\[([^\]]*)\]', body).group(1)
+        pages = []
+        for kid in _REF.findall(kids):
+            pages.extend(_page_numbers(objects, int(kid[0])))
+        return pages
+    return [node]
+
+
+def pdf_string(text):
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return '(' + escaped.encode('latin-1', 'replace').decode('latin-1') + ')'
+
+
+def pdf_text_string(text):
+    # Text strings outside latin-1 (outline titles) are written as UTF-16BE
+    try:
+        text.encode('latin-1')
+    except UnicodeEncodeError:
+        return '<FEFF' + text.encode('utf-16-be').hex().upper() + '>'
+    return pdf_string(text)
+
+
+class _Writer:
+
+    def __init__(self, first=4):
+        # merge_pdfs() reserves 1: page tree, 2: catalog, 3: info
+        self.objects = {}
+        self.next_num = first
+        self.seen = {}
+
+    def alloc(self):
+        num = self.next_num
+        self.next_num += 1
+        return num
+
+    def add(self, body, stream=None, num=None, dedupe=True):
+        key = None
+        if dedupe:
+            key = hashlib.sha1(body + b'\0' + (stream or b'')).digest()
+            if key in self.seen:
+                return self.seen[key]
+        if num is None:
+            num = self.alloc()
+        self.objects[num] = (body, stream)
+        if key is not None:
+            self.seen[key] = num
+        return num
+
+    def copy_part(self, objects, pages):
+        # Every copied page hangs off the merged page tree (object 1)
+        return self.copy_objects(objects, pages, reparent=True)
+
+    def copy_objects(self, objects, roots, reparent=False):
+        done = {}
+        visiting = set()
+        early = {}
+
+        def rewrite(body):
+            if not reparent:
+                return _REF.sub(lambda m: b'%d 0 R' % visit(int(m.group(1))), body)
+            body = _PARENT.sub(b'/Parent \0', body)
+            body = _REF.sub(lambda m: b'%d 0 R' % visit(int(m.group(1))), body)
+            return body.replace(b'/Parent \0', b'/Parent 1 0 R')
+
+        def visit(old):
+            if old in done:
+                return done[old]
+            if old in visiting:
+                # Reference cycle: hand out a number now and skip dedupe
+                if old not in early:
+                    early[old] = self.alloc()
+                return early[old]
+            visiting.add(old)
+            body, stream = objects[old]
+            # Identical pages must stay separate objects
+            dedupe = old not in early and not _PAGE.search(body)
+            body = rewrite(body)
+            num = self.add(body, stream, num=early.get(old), dedupe=dedupe)
+            visiting.discard(old)
+            done[old] = num
+            return num
+
+        return [visit(root) for root in roots]
+
+    def add_outline(self, entries, kids):
+        if not entries:
+            return None
+        root = self.alloc()
+        nums = [self.alloc() for _ in entries]
+        for i, (title, page) in enumerate(entries):
+            item = f'<< /Title {pdf_text_string(title)} /Parent {root} 0 R /Dest [ {kids[page]} 0 R /Fit ]'
+            if i:
+                item += f' /Prev {nums[i - 1]} 0 R'
+            if i + 1 < len(nums):
+                item += f' /Next {nums[i + 1]} 0 R'
+            self.objects[nums[i]] = ((item + ' >>').encode('latin-1'), None)
+        self.objects[root] = (f'<< /Type /Outlines /First {nums[0]} 0 R /Last {nums[-1]} 0 R '
+                              f'/Count {len(nums)} >>'.encode(), None)
+        return root
+
+    def serialize(self, kids, version, info, outlines=None, object_streams=False):
+        kids_refs = ' '.join(f'{k} 0 R' for k in kids)
+        self.objects[1] = (f'<< /Type /Pages /Count {len(kids)} /Kids [ {kids_refs} ] >>'.encode(), None)
+        catalog = '<< /Type /Catalog /Pages 1 0 R'
+        if outlines:
+            catalog += f' /Outlines {outlines} 0 R /PageMode /UseOutlines'
+        self.objects[2] = ((catalog + ' >>').encode(), None)
+        info_items = ' '.join(f'/{k} {pdf_string(v)}' for k, v in (info or {}).items())
+        self.objects[3] = (f'<< {info_items} >>'.encode('latin-1'), None)
+        return self.write(version, 2, 3, object_streams)
+
+    def write(self, version, root, info, object_streams=False):
+        # With object_streams, every non-stream object is packed into one
+        # compressed object stream and the xref becomes a stream too (PDF 1.5)
+        packed = []
+        if object_streams:
+            version = max(version, b'1.5')
+            packed = [num for num in sorted(self.objects) if self.objects[num][1] is None]
+            self._pack(packed)
+
+        out = [b'%PDF-' + version + b'\n%\xe2\xe3\xcf\xd3\n']
+        pos = len(out[0])
+        offsets = {}
+        digest = hashlib.md5()
+        for num in sorted(self.objects):
+            body, stream = self.objects[num]
+            if stream is None and object_streams:
+                continue
+            chunk = b'%d 0 obj\n' % num + body + b'\n'
+            if stream is not None:
+                chunk += b'stream\n' + stream + b'\nendstream\n'
+            chunk += b'endobj\n'
+            offsets[num] = pos
+            pos += len(chunk)
+            out.append(chunk)
+            digest.update(chunk)
+        file_id = digest.hexdigest().encode()
+
+        if object_streams:
+            return b''.join(out) + self._xref_stream(offsets, packed, root, info, file_id, pos)
+
+        size = max(self.objects) + 1
+        xref = [b'xref\n0 %d\n' % size, b'0000000000 65535 f \n']
+        for num in range(1, size):
+            if num in offsets:
+                xref.append(b'%010d 00000 n \n' % offsets[num])
+            else:
+                xref.append(b'0000000000 65535 f \n')
+        trailer = (b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R /ID [<%s><%s>] >>\nstartxref\n%d\n%%%%EOF\n'
+                   % (size, root, info, file_id, file_id, pos))
+        return b''.join(out + xref + [trailer])
+
+    def _pack(self, nums):
+        header = []
+        bodies = []
+        offset = 0
+        for num in nums:
+            body = self.objects[num][0] + b'\n'
+            header.append(b'%d %d' % (num, offset))
+            bodies.append(body)
+            offset += len(body)
+        header = b' '.join(header) + b'\n'
+        data = zlib.compress(header + b''.join(bodies), 9)
+        self._objstm = self.alloc()
+        self.objects[self._objstm] = (
+            b'<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>'
+            % (len(nums), len(header), len(data)), data)
+
+    def _xref_stream(self, offsets, packed, root, info, file_id, pos):
+        xref_num = self.alloc()
+        offsets[xref_num] = pos
+        index = {num: i for i, num in enumerate(packed)}
+        rows = [struct.pack('>BIH', 0, 0, 65535)]
+        for num in range(1, xref_num + 1):
+            if num in offsets:
+                rows.append(struct.pack('>BIH', 1, offsets[num], 0))
+            elif num in index:
+                rows.append(struct.pack('>BIH', 2, self._objstm, index[num]))
+            else:
+                rows.append(struct.pack('>BIH', 0, 0, 0))
+        data = zlib.compress(b''.join(rows), 9)
+        head = (b'<< /Type /XRef /Size %d /W [ 1 4 2 ] /Root %d 0 R /Info %d 0 R /ID [<%s><%s>] '
+                b'/Filter /FlateDecode /Length %d >>' % (xref_num + 1, root, info, file_id, file_id, len(data)))
+        return (b'%d 0 obj\n' % xref_num + head + b'\nstream\n' + data + b'\nendstream\nendobj\n'
+                + b'startxref\n%d\n%%%%EOF\n' % pos)
+
+
+def count_pages(data):
+    objects, root, _ = _parse(data)
+    return len(_page_numbers(objects, _get_ref(objects[root][0], rb'Pages')))
+
+
+def merge_pdfs(parts, info=None, outline=None, object_streams=False):
+    # parts: PDF documents as bytes, concatenated page-wise in order.
+    # outline: optional flat list of (title, page index) bookmarks.
+    writer = _Writer()
+    kids = []
+    version = b'1.3'
+    for data in parts:
+        objects, root, part_version = _parse(data)
+        _retag_subsets(objects)
+        version = max(version, part_version)
+        pages = _page_numbers(objects, _get_ref(objects[root][0], rb'Pages'))
+        kids.extend(writer.copy_part(objects, pages))
+    return writer.serialize(kids, version, info, writer.add_outline(outline, kids), object_streams)
+
+
+def compact_pdf(data):
+    # Rewrites a whole document with duplicate objects merged and the
+    # non-stream objects packed into an object stream
+    objects, root, version = _parse(data)
+    trailer = data[data.rindex(b'trailer'):]
+    info = re.search(rb'/Info (\d+) \d+ R', trailer)
+    writer = _Writer(first=1)
+    new_root = writer.copy_objects(objects, [root])[0]
+    new_info = writer.copy_objects(objects, [int(info.group(1))])[0]
+    return writer.write(version, new_root, new_info, object_streams=True)
@@ -0,0 +1,222 @@
+from guide_content import CONTENT, TOC_SECTIONS, content_config, iter_blocks, catalog_rows
+from atomic_files import write_atomic
+from html import escape as html_escape, unescape
+import argparse
+import re
+import sys
+
+# The guide in any of its output formats, from the one content model in
+# guide_content.json. HTML and Markdown are rendered straight from the
+# blocks with the stdlib; ReportLab and the PDF layout code are only
+# imported the first time a PDF is asked for, so a process serving the
+# lightweight formats never pays for them.
+#
+#   python guide_render.py --format html -o download/guia.html
+
+FORMATS = {
+    # format: (content type, file extension)
+    'pdf': ('application/pdf', '.pdf'),
+    'html': ('text/html; charset=utf-8', '.html'),
+    'markdown': ('text/markdown; charset=utf-8', '.md'),
+}
+
+# Only the config keys the text formats read; PDF layout settings are
+# accepted and ignored
+TEXT_KEYS = frozenset(content_config()) | {'catalog'}
+
+HTML_STYLE = '''
+body{font-family:system-ui,sans-serif;max-width:46rem;margin:0 auto;padding:1rem;line-height:1.6;color:#111}
+header{text-align:center;padding:3rem 0}
+header h1{color:#6366f1;font-size:1.9rem;margin:0}
+.brand{color:#8b5cf6;font-size:2.4rem;font-weight:bold;margin:1rem 0}
+.subtitle,.year{color:#808080}
+h2{color:#6366f1}
+h3{color:#8b5cf6}
+ul.plain{list-style:none;padding-left:1.25rem}
+.highlight{background:#f0f9ff;padding:.5rem .75rem}
+table{border-collapse:collapse;width:100%;font-size:.9rem;text-align:center}
+th{background:#6366f1;color:#fff}
+th,td{border:1px solid #808080;padding:.35rem}
+tr:nth-child(odd) td{background:#f5f5f5}
+'''.strip()
+
+
+def _text_config(config):
+    cfg = content_config()
+    cfg['catalog'] = None
+    if config:
+        cfg.update((k, v) for k, v in config.items() if k in TEXT_KEYS)
+    return cfg
+
+
+def _toc(cfg, escape):
+    # (section key, TOC text) pairs, like the PDF's table of contents
+    entries = [(key, escape(item)) for key, item in zip(TOC_SECTIONS, cfg['toc_items'])]
+    if cfg['catalog'] is not None:
+        entries.append(('catalog', escape(CONTENT['catalog']['title'])))
+    return entries
+
+
+def _html_markup(text):
+    return text.replace('<b>', '<strong>').replace('</b>', '</strong>')
+
+
+def _html_table(header, rows):
+    out = ['<table>', '<thead><tr>' + ''.join(f'<th>{html_escape(h)}</th>' for h in header) + '</tr></thead>', '<tbody>']
+    out.extend('<tr>' + ''.join(f'<td>{c}</td>' for c in row) + '</tr>' for row in rows)
+    out.append('</tbody></table>')
+    return out
+
+
+def render_html(config=None):
+    # A single self-contained page: inline CSS, no scripts or fonts
+    cfg = _text_config(config)
+    esc = html_escape
+    title = esc(CONTENT['meta']['document_title'].format_map(cfg))
+    out = [
+        '<!DOCTYPE html>',
+        '<html lang="es">',
+        '<head>',
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f'<title>{title}</title>',
+        f"<meta name=\"author\" content=\"{esc(cfg['author'])}\">",
+        f"<meta name=\"description\" content=\"{esc(cfg['subject'])}\">",
+        f'<style>{HTML_STYLE}</style>',
+        '</head>',
+        '<body>',
+        '<header>',
+        f"<h1>{esc(cfg['title'])}</h1>",
+        f"<p class=\"brand\">{esc(cfg['brand'])}</p>",
+        f"<p class=\"subtitle\">{esc(cfg['subtitle'])}</p>",
+        f"<p class=\"year\">{esc(cfg['year'])}</p>",
+        '</header>',
+    ]
+
+    out.append(f"<nav><h2>{esc(CONTENT['toc_title'])}</h2><ul class=\"plain\">")
+    out.extend(f'<li><a href="#{key}">{text}</a></li>' for key, text in _toc(cfg, esc))
+    out.append('</ul></nav>')
+
+    for section in CONTENT['sections']:
+        out.append(f"<section id=\"{section['key']}\">")
+        out.append(f"<h2>{esc(section['title'])}</h2>")
+        for kind, *block in iter_blocks(section, cfg, _html_markup, esc):
+            if kind == 'heading':
+                out.append(f'<h3>{block[0]}</h3>')
+            elif kind == 'paragraph':
+                out.append(f'<p>{block[0]}</p>')
+            elif kind == 'highlight':
+                out.append(f'<p class="highlight">{block[0]}</p>')
+            elif kind == 'list':
+                items, marker, _ = block
+                out.append('<ul>' if marker else '<ul class="plain">')
+                out.extend('<li>' + '<br>'.join(lines) + '</li>' for lines in items)
+                out.append('</ul>')
+            elif kind == 'table':
+                out.extend(_html_table(block[0], block[1]))
+        out.append('</section>')
+
+    if cfg['catalog'] is not None:
+        out.append('<section id="catalog">')
+        out.append(f"<h2>{esc(CONTENT['catalog']['title'])}</h2>")
+        rows = ([esc(c) for c in row] for row in catalog_rows(cfg['catalog']))
+        out.extend(_html_table(CONTENT['catalog']['header'], rows))
+        out.append('</section>')
+    out += ['</body>', '</html>', '']
+    return '\n'.join(out)
+
+
+_MD_SPECIAL = re.compile(r'([\\`*_\[\]<>|#])')
+
+
+def _md_escape(text):
+    return _MD_SPECIAL.sub(r'\\\1', text)
+
+
+def _md_markup(text):
+    # The model's markup is <b> and XML entities; {fields} pass through
+    parts = re.split(r'</?b>', text)
+    return '**'.join(_md_escape(unescape(part)) for part in parts)
+
+
+def _md_table(header, rows):
+    out = ['| ' + ' | '.join(_md_escape(h) for h in header) + ' |', '|' + ' --- |' * len(header)]
+    out.extend('| ' + ' | '.join(row) + ' |' for row in rows)
+    out.append('')
+    return out
+
+
+def render_markdown(config=None):
+    cfg = _text_config(config)
+    esc = _md_escape
+    out = [
+        f"# {esc(cfg['title'])}",
+        '',
+        f"**{esc(cfg['brand'])}** - {esc(cfg['subtitle'])} ({esc(cfg['year'])})",
+        '',
+        f"## {esc(CONTENT['toc_title'])}",
+        '',
+    ]
+    out.extend(f'- [{text}](#{key})' for key, text in _toc(cfg, esc))
+    out.append('')
+
+    for section in CONTENT['sections']:
+        # Explicit anchors: heading slugs differ between Markdown renderers
+        out += [f"<a id=\"{section['key']}\"></a>", '', f"## {esc(section['title'])}", '']
+        for kind, *block in iter_blocks(section, cfg, _md_markup, esc):
+            if kind == 'heading':
+                out += [f'### {block[0]}', '']
+            elif kind == 'paragraph':
+                out += [block[0], '']
+            elif kind == 'highlight':
+                out += [f'> {block[0]}', '']
+            elif kind == 'list':
+                out.extend('- ' + '  \n  '.join(lines) for lines in block[0])
+                out.append('')
+            elif kind == 'table':
+                out.extend(_md_table(block[0], block[1]))
+
+    if cfg['catalog'] is not None:
+        out += ['<a id="catalog"></a>', '', f"## {esc(CONTENT['catalog']['title'])}", '']
+        rows = ([esc(c) for c in row] for row in catalog_rows(cfg['catalog']))
+        out.extend(_md_table(CONTENT['catalog']['header'], rows))
+    return '\n'.join(out)
+
+
+def _render_pdf(config):
+    from generate_monetization_guide import render_guide
+    return render_guide(dict(config or {}, output=None))
+
+
+def render(fmt, config=None):
+    # The guide as bytes in one of FORMATS
+    if fmt == 'pdf':
+        return _render_pdf(config)
+    if fmt == 'html':
+        return render_html(config).encode('utf-8')
+    if fmt == 'markdown':
+        return render_markdown(config).encode('utf-8')
+    raise ValueError(f'unknown format {fmt!r}; expected one of {", ".join(FORMATS)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the monetization guide')
+    parser.add_argument('--format', choices=FORMATS, default='html')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--brand', help='brand shown in the guide')
+    parser.add_argument('--catalog-db', metavar='DB', help='append the tool catalog from a tools_catalog.py store')
+    args = parser.parse_args()
+
+    config = {}
+    if args.brand:
+        config['brand'] = args.brand
+    if args.catalog_db:
+        from tools_catalog import iter_tools
+        config['catalog'] = iter_tools(args.catalog_db)
+
+    data = render(args.format, config)
+    if args.output:
+        write_atomic(args.output, data)
+        print(f'Guia ({args.format}) generada en {args.output}', file=sys.stderr)
+    else:
+        sys.stdout.buffer.write(data)
@@ -0,0 +1,385 @@
+from generate_monetization_guide import _init_worker, subset_seeds
+from guide_content import CONTENT_KEYS, META_KEYS, content_config
+from guide_render import render as render_document, FORMATS
+from guide_cache import SECTION_CACHE_DIR
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, deque
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import time
+
+# Long-lived render service for personalized guides, stdlib only. An
+# asyncio front end speaks plain HTTP/1.1 on a Unix socket (or a localhost
+# port), so the Next.js routes can call it with Node's http module and a
+# socketPath. Renders run in a pool of worker processes that load fonts and
+# styles once. Identical requests share one render while it is in flight,
+# and recent results are kept in memory. A request's "format" picks PDF
+# (the default), HTML or Markdown; the text formats skip PDF layout and run
+# on a thread of the event loop's default executor, so they never queue
+# behind PDF renders for a pool worker.
+#
+#   POST /render   JSON body with config overrides -> application/pdf,
+#                  text/html or text/markdown; the body may be sent with
+#                  Content-Length or chunked, as Node does without a length
+#   GET  /metrics  queue depth, hit counts and render latency
+#   GET  /health
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'megia-guide.sock')
+
+# Config keys a request may set: the cover text, the content lists, a
+# catalog appendix, compact output and the format. Output paths, caches,
+# workers, part sizes and local files stay under the service's control.
+REQUEST_KEYS = frozenset(META_KEYS) | set(CONTENT_KEYS) | {'catalog', 'compact', 'format'}
+
+# Values per item of each content list, as in the defaults; None for lists
+# of plain strings
+_ITEM_SIZES = {key: len(value[0]) if value and isinstance(value[0], list) else None
+               for key, value in content_config().items() if key in CONTENT_KEYS}
+
+CATALOG_FIELDS = ('name', 'category', 'pricing')
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+LATENCY_WINDOW = 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 501: 'Not Implemented'}
+
+
+class RequestError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm():
+    # Sectioned renders seed their font subsets from a probe layout; pay
+    # for it before the first request
+    subset_seeds()
+    return os.getpid()
+
+
+def _check_list(key, value):
+    if not isinstance(value, list):
+        raise RequestError(400, f'{key} must be a list')
+    size = _ITEM_SIZES[key]
+    for i, item in enumerate(value):
+        if size is None:
+            if not isinstance(item, str):
+                raise RequestError(400, f'{key}[{i}] must be a string')
+        elif not (isinstance(item, list) and len(item) == size and all(isinstance(v, str) for v in item)):
+            raise RequestError(400, f'{key}[{i}] must be a list of {size} strings')
+
+
+def _check_catalog(value):
+    if value is None:
+        return
+    if not isinstance(value, list):
+        raise RequestError(400, 'catalog must be a list of tools or null')
+    for i, tool in enumerate(value):
+        if not isinstance(tool, dict):
+            raise RequestError(400, f'catalog[{i}] must be an object')
+        for field in CATALOG_FIELDS:
+            if not isinstance(tool.get(field), str):
+                raise RequestError(400, f'catalog[{i}].{field} must be a string')
+        rating = tool.get('rating')
+        if rating is not None and (isinstance(rating, bool) or not isinstance(rating, (int, float))):
+            raise RequestError(400, f'catalog[{i}].rating must be a number or null')
+
+
+def validate_request(overrides):
+    # Rejects unknown keys and values of the wrong shape with a 400 before
+    # anything is queued, so bad input never surfaces as a render error
+    unknown = set(overrides) - REQUEST_KEYS
+    if unknown:
+        raise RequestError(400, f"unknown config keys: {', '.join(sorted(unknown))}")
+    for key, value in overrides.items():
+        if key in META_KEYS:
+            if not isinstance(value, str):
+                raise RequestError(400, f'{key} must be a string')
+        elif key in CONTENT_KEYS:
+            _check_list(key, value)
+        elif key == 'catalog':
+            _check_catalog(value)
+        elif key == 'compact':
+            if not isinstance(value, bool):
+                raise RequestError(400, 'compact must be true or false')
+        elif key == 'format':
+            if not isinstance(value, str) or value not in FORMATS:
+                raise RequestError(400, f"unknown format {value!r}; expected one of {', '.join(FORMATS)}")
+
+
+async def _read_chunked(reader, limit=MAX_BODY_BYTES):
+    # Transfer-Encoding: chunked; extensions and trailers are read and
+    # ignored
+    body = bytearray()
+    try:
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            try:
+                size = int(line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise RequestError(400, 'invalid chunk size') from None
+            if size == 0:
+                break
+            if len(body) + size > limit:
+                raise RequestError(413, 'body too large')
+            body += await reader.readexactly(size)
+            if await reader.readexactly(2) != b'\r\n':
+                raise RequestError(400, 'chunk not terminated by CRLF')
+        while await reader.readuntil(b'\r\n') != b'\r\n':
+            pass
+    except asyncio.LimitOverrunError:
+        raise RequestError(400, 'chunk line too long') from None
+    return bytes(body)
+
+
+async def read_body(reader, headers):
+    encoding = headers.get('transfer-encoding', '').lower()
+    if encoding:
+        if encoding != 'chunked':
+            raise RequestError(501, f'unsupported transfer encoding {encoding!r}')
+        return await _read_chunked(reader)
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise RequestError(400, 'invalid Content-Length') from None
+    if length < 0:
+        raise RequestError(400, 'invalid Content-Length')
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, 'body too large')
+    return await reader.readexactly(length) if length else b''
+
+
+def request_key(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+
+class RenderService:
+
+    def __init__(self, workers=None, cache_bytes=64 * 1024 * 1024, section_cache=SECTION_CACHE_DIR):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_bytes = cache_bytes
+        self.section_cache = section_cache
+        self._pool = None
+        self._inflight = {}
+        self._pdf_inflight = 0
+        self._waiting = 0
+        self._results = OrderedDict()
+        self._result_bytes = 0
+        self._render_s = deque(maxlen=LATENCY_WINDOW)
+        self._request_s = deque(maxlen=LATENCY_WINDOW)
+        self.counters = dict.fromkeys(('requests', 'renders', 'cache_hits', 'coalesced', 'errors'), 0)
+        self.started = time.time()
+
+    async def start(self):
+        # spawn, not fork: the parent is running an event loop
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm) for _ in range(self.workers)))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _remember(self, key, data):
+        if len(data) > self.cache_bytes:
+            return
+        self._results[key] = data
+        self._result_bytes += len(data)
+        while self._result_bytes > self.cache_bytes:
+            _, old = self._results.popitem(last=False)
+            self._result_bytes -= len(old)
+
+    async def _render(self, key, fmt, config):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        if fmt == 'pdf':
+            self._pdf_inflight += 1
+        try:
+            # None: the default thread pool, for the millisecond text renders
+            executor = self._pool if fmt == 'pdf' else None
+            data = await loop.run_in_executor(executor, render_document, fmt, config)
+        finally:
+            del self._inflight[key]
+            if fmt == 'pdf':
+                self._pdf_inflight -= 1
+        self._render_s.append(time.perf_counter() - start)
+        self.counters['renders'] += 1
+        self._remember(key, data)
+        return data
+
+    async def render(self, overrides):
+        # Returns (document bytes, 'hit' | 'coalesced' | 'miss')
+        validate_request(overrides)
+        config = dict(overrides, output=None, cache_dir=self.section_cache)
+        fmt = config.pop('format', 'pdf')
+        key = request_key(dict(config, format=fmt))
+
+        data = self._results.get(key)
+        if data is not None:
+            self._results.move_to_end(key)
+            self.counters['cache_hits'] += 1
+            return data, 'hit'
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters['coalesced'] += 1
+            source = 'coalesced'
+        else:
+            task = self._inflight[key] = asyncio.ensure_future(self._render(key, fmt, config))
+            source = 'miss'
+        # A client hanging up doesn't cancel a render others may share
+        self._waiting += 1
+        try:
+            return await asyncio.shield(task), source
+        finally:
+            self._waiting -= 1
+
+    def metrics(self):
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'workers': self.workers,
+            # Distinct renders in flight, PDF renders still waiting for a
+            # free worker, and the requests waiting on them
+            'inflight': len(self._inflight),
+            'queue_depth': max(0, self._pdf_inflight - self.workers),
+            'waiting_requests': self._waiting,
+            'cached_results': len(self._results),
+            'cached_bytes': self._result_bytes,
+            **self.counters,
+            'render_ms': {q: _percentile(self._render_s, p) for q, p in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))},
+            'request_ms': {q: _percentile(self._request_s, p) for q, p in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))},
+        }
+
+    async def _respond(self, method, path, body):
+        if path == '/health':
+            return 200, 'application/json', b'{"ok":true}', {}
+        if path == '/metrics':
+            return 200, 'application/json', json.dumps(self.metrics()).encode(), {}
+        if path != '/render':
+            raise RequestError(404, f'no route for {path}')
+        if method != 'POST':
+            raise RequestError(405, 'use POST')
+        try:
+            overrides = json.loads(body or b'{}')
+        except ValueError as exc:
+            raise RequestError(400, f'invalid JSON: {exc}') from None
+        if not isinstance(overrides, dict):
+            raise RequestError(400, 'body must be a JSON object')
+        data, source = await self.render(overrides)
+        return 200, FORMATS[overrides.get('format', 'pdf')][0], data, {'X-Guide-Cache': source}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 413, 'application/json', b'{"error":"headers too large"}', {}, False)
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                method, path, version = (lines[0].split(' ') + ['', '', ''])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                start = time.perf_counter()
+                self.counters['requests'] += 1
+                body = None
+                try:
+                    body = await read_body(reader, headers)
+                    status, content_type, payload, extra = await self._respond(method, path.split('?')[0], body)
+                except RequestError as exc:
+                    self.counters['errors'] += 1
+                    status, content_type, extra = exc.status, 'application/json', {}
+                    payload = json.dumps({'error': str(exc)}).encode()
+                    if body is None:
+                        # The rest of the body is still unread, so the
+                        # stream can't be resynchronised
+                        keep_alive = False
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as exc:
+                    self.counters['errors'] += 1
+                    status, content_type, extra = 500, 'application/json', {}
+                    payload = json.dumps({'error': f'{type(exc).__name__}: {exc}'}).encode()
+                    keep_alive = keep_alive and body is not None
+                if path.startswith('/render'):
+                    self._request_s.append(time.perf_counter() - start)
+                await self._send(writer, status, content_type, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, content_type, payload, extra, keep_alive):
+        head = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}',
+                f'Content-Type: {content_type}',
+                f'Content-Length: {len(payload)}',
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f'{k}: {v}' for k, v in extra.items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def serve(service, socket_path=None, port=None):
+    await service.start()
+    if port is not None:
+        server = await asyncio.start_server(service.handle, '127.0.0.1', port, limit=MAX_HEADER_BYTES)
+        where = f'http://127.0.0.1:{port}'
+    else:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(service.handle, socket_path, limit=MAX_HEADER_BYTES)
+        where = socket_path
+    print(f'Servicio de guias listo en {where} ({service.workers} workers)', flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local render service for personalized guides')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket to listen on')
+    parser.add_argument('--port', type=int, help='listen on 127.0.0.1:PORT instead of a socket')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-mb', type=int, default=64, help='memory for recently rendered guides')
+    parser.add_argument('--no-section-cache', action='store_true', help='always lay out every section')
+    args = parser.parse_args()
+
+    service = RenderService(
+        workers=args.workers,
+        cache_bytes=args.cache_mb * 1024 * 1024,
+        section_cache=None if args.no_section_cache else SECTION_CACHE_DIR,
+    )
+    asyncio.run(serve(service, args.socket, args.port))
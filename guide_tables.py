@@ -0,0 +1,112 @@
+from reportlab.platypus import Table, TableStyle
+from reportlab.lib import colors
+from guide_fonts import ensure_font
+from guide_text import GuideParagraph, string_width
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from functools import lru_cache
+
+# Plain-text cells are pre-wrapped into '\n'-separated strings, which Table
+# draws directly; only cells with markup pay for a Paragraph. Widths come
+# from guide_text's shared cache and the style commands are shared.
+# Tables built with cache=False (the catalog, whose rows are all distinct)
+# measure directly, so a large catalog doesn't fill the shared caches.
+
+CELL_PADDING_X = 6
+HEADER_SIZE = 10
+CELL_SIZE = 9
+LEADING = 12
+
+
+def _split_word(word, font, size, width, measure):
+    # Words wider than the column break between characters, like wordWrap='CJK'
+    pieces = []
+    piece = ''
+    for ch in word:
+        if piece and measure(piece + ch, font, size) > width:
+            pieces.append(piece)
+            piece = ch
+        else:
+            piece += ch
+    pieces.append(piece)
+    return pieces
+
+
+def _wrap(text, font, size, width, measure):
+    if measure(text, font, size) <= width:
+        return text
+    space = measure(' ', font, size)
+    lines = []
+    line = ''
+    line_width = 0
+    for word in text.split():
+        word_width = measure(word, font, size)
+        if word_width > width:
+            pieces = _split_word(word, font, size, width, measure)
+            if line:
+                lines.append(line)
+            lines.extend(pieces[:-1])
+            line = pieces[-1]
+            line_width = measure(line, font, size)
+        elif not line:
+            line, line_width = word, word_width
+        elif line_width + space + word_width <= width:
+            line += ' ' + word
+            line_width += space + word_width
+        else:
+            lines.append(line)
+            line, line_width = word, word_width
+    if line:
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=65536)
+def wrap_text(text, font, size, width):
+    return _wrap(text, font, size, width, string_width)
+
+
+def has_markup(text):
+    return '<' in text or '&' in text
+
+
+@lru_cache(maxsize=None)
+def table_style(padding=8, font='SimHei'):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, -1), font),
+        ('FONTSIZE', (0, 0), (-1, 0), HEADER_SIZE),
+        ('FONTSIZE', (0, 1), (-1, -1), CELL_SIZE),
+        ('LEADING', (0, 0), (-1, -1), LEADING),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
+        ('TOPPADDING', (0, 0), (-1, -1), padding),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+    ])
+
+
+def _wrap_uncached(text, font, size, width):
+    return _wrap(text, font, size, width, stringWidth)
+
+
+def _cell(text, font, size, width, markup_style, wrap):
+    if has_markup(text):
+        return GuideParagraph(text, markup_style)
+    return wrap(text, font, size, width)
+
+
+def build_table(header, rows, col_widths, cell_style, padding=8, repeat_rows=0, cache=True):
+    # cell_style is only used for cells that contain markup
+    font = cell_style.fontName
+    ensure_font(font)
+    wrap = wrap_text if cache else _wrap_uncached
+    widths = [w - 2 * CELL_PADDING_X for w in col_widths]
+    data = [[wrap(h, font, HEADER_SIZE, w) for h, w in zip(header, widths)]]
+    for row in rows:
+        data.append([_cell(str(c), font, CELL_SIZE, w, cell_style, wrap) for c, w in zip(row, widths)])
+    table = Table(data, colWidths=col_widths, repeatRows=repeat_rows)
+    table.setStyle(table_style(padding, font))
+    return table
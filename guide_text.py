@@ -0,0 +1,108 @@
+from reportlab.platypus import paragraph, tables, Paragraph
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib import textsplit
+from contextlib import contextmanager
+from functools import lru_cache
+import copy
+import re
+
+# Text measurement shared by every render in the process. Widths are
+# memoized per (text, font, size), and a paragraph's line breaks per (text,
+# style, width), so repeated and templated content is measured once per
+# worker instead of once per PDF. The guide's styles ask for wordWrap='CJK'
+# so that CJK text can break between any two characters; paragraphs with
+# no CJK characters are wrapped at spaces instead, which measures words
+# rather than single characters and keeps Spanish words whole.
+
+BREAK_CACHE_SIZE = 16384
+
+# Hangul, CJK punctuation, kana and ideographs, compatibility and
+# fullwidth forms, and the supplementary ideograph planes
+_CJK = re.compile(
+    '[\u1100-\u11ff\u2e80-\u2fdf\u3000-\u9fff\ua960-\ua97f\uac00-\ud7af'
+    '\uf900-\ufaff\ufe30-\ufe4f\uff00-\uffef\U00020000-\U0003ffff]'
+)
+
+# Paragraph attributes set by wrap(); restored on a cache hit
+_BREAK_STATE = ('width', 'height', 'blPara', 'frags', '_wrapWidths', '_width_max',
+                '_splitLongWordCount', '_hyphenations')
+
+_breaks = {}
+_latin_styles = {}
+
+
+@lru_cache(maxsize=65536)
+def string_width(text, font, size):
+    return pdfmetrics.stringWidth(text, font, size)
+
+
+def _measure(text, fontName, fontSize, encoding='utf8'):
+    if isinstance(text, str):
+        return string_width(text, fontName, fontSize)
+    return pdfmetrics.stringWidth(text, fontName, fontSize, encoding)
+
+
+# Modules whose line breaking measures text through their own stringWidth
+_MEASURING_MODULES = (paragraph, textsplit, tables)
+
+
+@contextmanager
+def cached_measurement():
+    # Routes ReportLab's layout-time stringWidth calls through string_width
+    # for the duration of one build
+    saved = [module.stringWidth for module in _MEASURING_MODULES]
+    for module in _MEASURING_MODULES:
+        module.stringWidth = _measure
+    try:
+        yield
+    finally:
+        for module, fn in zip(_MEASURING_MODULES, saved):
+            module.stringWidth = fn
+
+
+def has_cjk(text):
+    return _CJK.search(text) is not None
+
+
+def latin_style(style):
+    # The same style wrapped at spaces
+    latin = _latin_styles.get(style)
+    if latin is None:
+        latin = _latin_styles[style] = style.clone(f'{style.name}-latin', wordWrap=None)
+    return latin
+
+
+class GuideParagraph(Paragraph):
+    # Paragraph that picks Latin wrapping for text without CJK characters
+    # and shares its line breaks with every paragraph of the same text,
+    # style and width. Split paragraphs (built from frags) aren't cached.
+
+    def __init__(self, text, style=None, bulletText=None, frags=None, caseSensitive=1, encoding='utf8'):
+        if frags is None and style is not None and style.wordWrap == 'CJK' and not has_cjk(text):
+            style = latin_style(style)
+        self._break_key = None if frags is not None else (text, style, bulletText, caseSensitive, encoding)
+        Paragraph.__init__(self, text, style, bulletText, frags, caseSensitive, encoding)
+
+    def wrap(self, availWidth, availHeight):
+        if self._break_key is None or availWidth < paragraph._FUZZ:
+            return Paragraph.wrap(self, availWidth, availHeight)
+        key = self._break_key + (availWidth,)
+        state = _breaks.get(key)
+        if state is None:
+            Paragraph.wrap(self, availWidth, availHeight)
+            if len(_breaks) >= BREAK_CACHE_SIZE:
+                _breaks.clear()
+            state = _breaks[key] = {k: self.__dict__[k] for k in _BREAK_STATE if k in self.__dict__}
+        else:
+            self.__dict__.update(state)
+        self._shared_lines = True
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        if not hasattr(self, 'blPara'):
+            self.wrap(availWidth, availHeight)
+        if self.__dict__.pop('_shared_lines', False):
+            # Splitting edits the words it hands to the two halves, so it
+            # works on a private copy of the cached lines
+            self.blPara = copy.deepcopy(self.blPara)
+        return Paragraph.split(self, availWidth, availHeight)
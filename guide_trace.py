@@ -0,0 +1,189 @@
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Flowable
+import reportlab.platypus.paragraph as _paragraph
+import reportlab.platypus.tables as _tables
+import reportlab.pdfgen.textobject as _textobject
+import json
+import time
+
+# Optional layout instrumentation. Nothing here runs unless a LayoutTrace is
+# passed to render_guide(): the counting wrappers are only installed for the
+# duration of a traced build, so untraced renders run the stock code paths.
+
+_STRING_WIDTH_SITES = (
+    (pdfmetrics, 'stringWidth'),
+    (_paragraph, 'stringWidth'),
+    (_tables, 'stringWidth'),
+    (_textobject, 'pdfmetrics_stringWidth'),
+)
+
+COUNTERS = ('wrap_calls', 'split_calls', 'string_width_calls', 'glyphs_measured')
+
+
+class SectionMarker(Flowable):
+    # Zero-size flowable placed at the start of each section; it reports to
+    # the trace when the layout loop reaches it
+
+    def __init__(self, trace, name):
+        Flowable.__init__(self)
+        self.trace = trace
+        self.name = name
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.trace.enter(self.name)
+
+
+class LayoutTrace:
+
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.pages = 0
+        self.sections = []
+        self.save_s = 0.0
+        self._current = None
+        self._patched = []
+        self._started = None
+        self.total_s = None
+
+    def mark(self, name):
+        return SectionMarker(self, name)
+
+    def enter(self, name):
+        now = time.perf_counter()
+        self._close(now)
+        self._current = {
+            'name': name,
+            'cached': False,
+            '_start': now,
+            '_counters': dict(self.counters),
+            'first_page': self.pages + 1,
+        }
+
+    def resume(self):
+        # Reopens the last section when its layout goes on in another
+        # document (the page-bounded catalog parts); the time in between
+        # is not counted
+        now = time.perf_counter()
+        section = self.sections.pop()
+        self._current = {
+            'name': section['name'],
+            'cached': False,
+            '_start': now - section['seconds'],
+            '_counters': {key: self.counters[key] - section[key] for key in COUNTERS},
+            'first_page': section['first_page'],
+        }
+
+    def cached(self, name, pages):
+        # A section spliced in from the section cache: no layout work
+        self._close(time.perf_counter())
+        self.sections.append({
+            'name': name, 'cached': True, 'seconds': 0.0,
+            'first_page': self.pages + 1, 'pages': pages,
+            **dict.fromkeys(COUNTERS, 0),
+        })
+        self.pages += pages
+
+    def reorder(self, names):
+        # Sections rendered out of document order (the TOC in sectioned
+        # renders) are put back in order and their page ranges renumbered
+        self._close(time.perf_counter())
+        rank = {name: i for i, name in enumerate(names)}
+        self.sections.sort(key=lambda section: rank.get(section['name'], len(rank)))
+        page = 1
+        for section in self.sections:
+            section['first_page'] = page
+            page += section['pages']
+
+    def _close(self, now):
+        current = self._current
+        if current is None:
+            return
+        self._current = None
+        section = {
+            'name': current['name'],
+            'cached': False,
+            'seconds': round(now - current['_start'], 6),
+            'first_page': current['first_page'],
+            'pages': self.pages - current['first_page'] + 1,
+        }
+        for key in COUNTERS:
+            section[key] = self.counters[key] - current['_counters'][key]
+        self.sections.append(section)
+
+    def canvasmaker(self):
+        trace = self
+
+        class TracedCanvas(Canvas):
+            def showPage(self):
+                trace.pages += 1
+                super().showPage()
+
+            def save(self):
+                # The last section ends when its final page is flushed
+                start = time.perf_counter()
+                trace._close(start)
+                super().save()
+                trace.save_s += time.perf_counter() - start
+
+        return TracedCanvas
+
+    def __enter__(self):
+        counters = self.counters
+        self._patched = []
+
+        # Frames call wrap()/split() directly, so count them on every
+        # flowable class that defines its own
+        pending = [Flowable]
+        while pending:
+            cls = pending.pop()
+            pending.extend(cls.__subclasses__())
+            for attr, counter in (('wrap', 'wrap_calls'), ('split', 'split_calls')):
+                original = cls.__dict__.get(attr)
+                if original is None:
+                    continue
+
+                def counted(self, *args, _original=original, _counter=counter, **kwargs):
+                    counters[_counter] += 1
+                    return _original(self, *args, **kwargs)
+
+                self._patched.append((cls, attr, original))
+                setattr(cls, attr, counted)
+
+        for module, attr in _STRING_WIDTH_SITES:
+            original = getattr(module, attr)
+
+            def counted_string_width(text, *args, _original=original, **kwargs):
+                counters['string_width_calls'] += 1
+                counters['glyphs_measured'] += len(text)
+                return _original(text, *args, **kwargs)
+
+            self._patched.append((module, attr, original))
+            setattr(module, attr, counted_string_width)
+
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._close(time.perf_counter())
+        self.total_s = round(time.perf_counter() - self._started, 6)
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+        return False
+
+    def as_dict(self):
+        return {
+            'total_s': self.total_s,
+            'save_s': round(self.save_s, 6),
+            'pages': self.pages,
+            'counters': dict(self.counters),
+            'sections': self.sections,
+        }
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
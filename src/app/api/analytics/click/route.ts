@@ -8,9 +8,9 @@ export async function POST(request: Request) {
     const body = await request.json();
     const { toolId, toolName, toolUrl, category, action, timestamp } = body;
 
-    // In production, this would save to a database
-    // For now, we log and return success
-    console.log('[MONETIZATION TRACKING]', {
+    // One JSON line per event; tools_analytics.py ingests these logs into
+    // daily partitions
+    console.log('[MONETIZATION TRACKING]', JSON.stringify({
       toolId,
       toolName,
       toolUrl,
@@ -18,7 +18,7 @@ export async function POST(request: Request) {
       action, // 'click', 'visit', 'share', 'like', 'favorite'
       timestamp: timestamp || new Date().toISOString(),
       revenue: action === 'click' ? 0.001 : 0, // Estimated revenue per action
-    });
+    }));
 
     return NextResponse.json({
       success: true,
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The guide and tools modules live at the repository root, like the
+# benchmarks import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from atomic_files import write_atomic
+
+
+def test_replaces_whole_file(tmp_path):
+    path = tmp_path / 'out' / 'guide.pdf'
+    write_atomic(str(path), b'old')
+    write_atomic(str(path), b'new')
+    assert path.read_bytes() == b'new'
+    assert os.listdir(path.parent) == ['guide.pdf']
+
+
+@pytest.mark.parametrize('target', ['directory', 'fifo'])
+def test_refuses_non_regular_targets(tmp_path, target):
+    path = tmp_path / 'target'
+    if target == 'directory':
+        path.mkdir()
+    else:
+        os.mkfifo(path)
+    with pytest.raises(ValueError):
+        write_atomic(str(path), b'data')
+    assert not path.is_file()
+    assert os.listdir(tmp_path) == ['target']
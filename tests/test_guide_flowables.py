@@ -0,0 +1,49 @@
+import io
+
+import pytest
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+
+from guide_flowables import FlowableStream
+
+pypdf = pytest.importorskip('pypdf')
+
+
+def story():
+    body = getSampleStyleSheet()['BodyText']
+    yield Paragraph('Catalog', body)
+    for chunk in range(6):
+        yield Table([['name', 'price']] + [[f'tool {chunk}-{i}', str(i)] for i in range(40)], repeatRows=1)
+
+
+def build(flowables, max_pages=None):
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4)
+    if max_pages is not None:
+        flowables.stop_after(doc, max_pages)
+    doc.build(flowables)
+    if max_pages is not None:
+        flowables.stop_after(None, None)
+    return [page.extract_text() for page in pypdf.PdfReader(io.BytesIO(buf.getvalue())).pages]
+
+
+def test_stream_is_consumed_lazily():
+    stream = FlowableStream(iter(range(100)), lookahead=4)
+    assert len(stream) == 4
+    assert stream[0] == 0
+    del stream[0]
+    assert stream[0] == 1
+    assert bool(stream)
+
+
+def test_page_bounded_builds_break_pages_like_one_build():
+    single = build(FlowableStream(story()))
+    assert len(single) > 3
+
+    stream = FlowableStream(story())
+    parts = []
+    while not parts or stream:
+        parts.append(build(stream, max_pages=2))
+    assert all(len(pages) <= 2 for pages in parts)
+    assert [page for pages in parts for page in pages] == single
@@ -0,0 +1,105 @@
+import io
+import re
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+
+from guide_merge import PDFMergeError, compact_pdf, count_pages, merge_pdfs
+
+pypdf = pytest.importorskip('pypdf')
+
+
+def make_pdf(label, pages, font='Helvetica'):
+    buf = io.BytesIO()
+    canvas = Canvas(buf, invariant=1)
+    for i in range(pages):
+        canvas.setFont(font, 12)
+        canvas.drawString(72, 720, f'{label} page {i + 1}')
+        canvas.showPage()
+    canvas.save()
+    return buf.getvalue()
+
+
+def page_texts(data):
+    return [page.extract_text().strip() for page in pypdf.PdfReader(io.BytesIO(data), strict=True).pages]
+
+
+def font_refs(data):
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    refs = set()
+    for page in reader.pages:
+        fonts = page['/Resources']['/Font']
+        refs.update(fonts.raw_get(name).idnum for name in fonts)
+    return refs
+
+
+def outline_pages(data):
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    return [(item.title, reader.get_destination_page_number(item)) for item in reader.outline]
+
+
+@pytest.fixture
+def parts():
+    return [make_pdf('A', 2), make_pdf('B', 1), make_pdf('C', 3)]
+
+
+@pytest.mark.parametrize('object_streams', [False, True])
+def test_merge_round_trip(parts, object_streams):
+    outline = [('Primera', 0), ('Segunda', 2), ('Tercera', 3)]
+    data = merge_pdfs(parts, {'Title': 'Guia'}, outline, object_streams=object_streams)
+
+    assert page_texts(data) == [f'{label} page {n}' for label, pages in (('A', 2), ('B', 1), ('C', 3))
+                                for n in range(1, pages + 1)]
+    assert outline_pages(data) == outline
+    # Every part's Helvetica dictionary is the same object after merging
+    assert len(font_refs(data)) == 1
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    assert reader.metadata.title == 'Guia'
+    if object_streams:
+        assert data.startswith(b'%PDF-1.5')
+        assert b'/Type /XRef' in data and b'\nxref\n' not in data
+    else:
+        assert count_pages(data) == 6
+
+
+def test_compact_round_trip(parts):
+    original = merge_pdfs(parts, {'Title': 'Guia'}, [('Primera', 0), ('Tercera', 3)])
+    data = compact_pdf(original)
+
+    assert b'/Type /ObjStm' in data and b'/Type /XRef' in data
+    assert len(data) < len(original)
+    assert page_texts(data) == page_texts(original)
+    assert outline_pages(data) == [('Primera', 0), ('Tercera', 3)]
+    assert len(font_refs(data)) == 1
+
+
+def test_identical_pages_share_content():
+    # Parts that draw the same page keep one copy of its content stream
+    data = compact_pdf(merge_pdfs([make_pdf('A', 1), make_pdf('A', 1)]))
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    contents = {page.raw_get('/Contents').idnum for page in reader.pages}
+    assert len(reader.pages) == 2 and len(contents) == 1
+
+
+def test_merge_rejects_xref_streams(parts):
+    packed = merge_pdfs(parts, object_streams=True)
+    with pytest.raises(PDFMergeError):
+        merge_pdfs([packed])
+
+
+def test_subset_names_are_unique_per_glyph_set():
+    # Each part names its first subset AAAAAA+<font>; merged, different glyph
+    # sets get different names and identical ones stay a single font
+    pdfmetrics.registerFont(TTFont('Vera', 'Vera.ttf'))
+    parts = [make_pdf('ñandú', 1, 'Vera'), make_pdf('Zeta', 1, 'Vera'), make_pdf('ñandú', 1, 'Vera')]
+    assert all(b'/BaseFont /AAAAAA+BitstreamVeraSans-Roman' in part for part in parts)
+
+    data = merge_pdfs(parts)
+    names = set(re.findall(rb'/BaseFont /([A-Z]{6})\+BitstreamVeraSans-Roman', data))
+    assert len(names) == 2 and b'AAAAAA' not in names
+    assert len(set(re.findall(rb'/FontName /([A-Z]{6})\+BitstreamVeraSans-Roman', data))) == 2
+    # Two Vera subsets plus the canvas's initial Helvetica
+    assert len(font_refs(data)) == 3
+    assert page_texts(data) == ['ñandú page 1', 'Zeta page 1', 'ñandú page 1']
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import guide_service
+from guide_service import RenderService, RequestError, validate_request
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'brand': 'A <B & C>', 'compact': True, 'format': 'html'},
+    {'tips_adsense': ['uno', 'dos'], 'steps_adsense': [['Paso', 'Hazlo']], 'toc_items': ['a']},
+    {'catalog': None},
+    {'catalog': [{'name': 'Notion Q&A', 'category': 'productivity', 'pricing': 'paid', 'rating': 4.5},
+                 {'name': 'x', 'category': 'y', 'pricing': 'z'}]},
+])
+def test_validate_request_accepts(overrides):
+    validate_request(overrides)
+
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'workers': 4}, 'unknown config keys: workers'),
+    ({'image_dpi': 10, 'output': '/etc/passwd'}, 'unknown config keys: image_dpi, output'),
+    ({'brand': 5}, 'brand must be a string'),
+    ({'catalog': 5}, 'catalog must be a list'),
+    ({'catalog': ['x']}, 'catalog[0] must be an object'),
+    ({'catalog': [{'name': 'x', 'category': 'y'}]}, 'catalog[0].pricing must be a string'),
+    ({'catalog': [{'name': 'x', 'category': 'y', 'pricing': 'z', 'rating': True}]}, 'rating must be a number'),
+    ({'compact': 1}, 'compact must be true or false'),
+    ({'format': ['pdf']}, 'unknown format'),
+    ({'format': 'docx'}, 'unknown format'),
+    ({'tips_adsense': 'uno'}, 'tips_adsense must be a list'),
+    ({'tips_adsense': [['uno']]}, 'tips_adsense[0] must be a string'),
+    ({'steps_adsense': [['solo uno']]}, 'steps_adsense[0] must be a list of 2 strings'),
+])
+def test_validate_request_rejects(overrides, message):
+    with pytest.raises(RequestError) as info:
+        validate_request(overrides)
+    assert info.value.status == 400
+    assert message in str(info.value)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # The real pool spawns workers that load fonts; a thread pool and a
+    # fake renderer exercise the same request path
+    calls = []
+    lock = threading.Lock()
+
+    def render_document(fmt, config):
+        with lock:
+            calls.append((fmt, config.get('brand')))
+        time.sleep(0.05)
+        return f"{fmt}:{config.get('brand', '')}".encode()
+
+    monkeypatch.setattr(guide_service, 'render_document', render_document)
+    service = RenderService(workers=2, section_cache=None)
+    service._pool = ThreadPoolExecutor(2)
+    service.calls = calls
+    yield service
+    service.close()
+
+
+def test_identical_requests_share_a_render(service):
+    async def run():
+        first = await asyncio.gather(*(service.render({'brand': 'A'}) for _ in range(3)),
+                                     service.render({'brand': 'B'}))
+        again = await service.render({'brand': 'A'})
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert [source for _, source in first] == ['miss', 'coalesced', 'coalesced', 'miss']
+    assert first[0][0] == b'pdf:A' and first[3][0] == b'pdf:B'
+    assert again == (b'pdf:A', 'hit')
+    assert sorted(service.calls) == [('pdf', 'A'), ('pdf', 'B')]
+    assert service.counters['coalesced'] == 2 and service.counters['cache_hits'] == 1
+    assert service.metrics()['inflight'] == 0
+
+
+def test_formats_are_cached_separately(service):
+    async def run():
+        return [await service.render({'brand': 'A', 'format': fmt}) for fmt in ('pdf', 'html', 'markdown')]
+
+    results = asyncio.run(run())
+    assert [data for data, _ in results] == [b'pdf:A', b'html:A', b'markdown:A']
+    assert all(source == 'miss' for _, source in results)
+
+
+async def _exchange(service, raw):
+    # Sends raw bytes to the handler and returns the parsed responses
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(raw)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    responses = []
+    while data:
+        head, _, rest = data.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.split(': ', 1) for line in lines[1:])
+        length = int(headers['Content-Length'])
+        responses.append((int(lines[0].split(' ')[1]), headers, rest[:length]))
+        data = rest[length:]
+    return responses
+
+
+def _request(body, headers=(), path='/render', method='POST'):
+    head = [f'{method} {path} HTTP/1.1', 'Host: localhost', *headers]
+    return ('\r\n'.join(head) + '\r\n\r\n').encode() + body
+
+
+def _chunked(body, size=5):
+    chunks = [body[i:i + size] for i in range(0, len(body), size)]
+    return b''.join(b'%x\r\n%s\r\n' % (len(c), c) for c in chunks) + b'0\r\n\r\n'
+
+
+def test_http_content_length_and_keep_alive(service):
+    body = json.dumps({'brand': 'A', 'format': 'html'}).encode()
+    raw = (_request(body, [f'Content-Length: {len(body)}'])
+           + _request(b'', ['Connection: close'], path='/health', method='GET'))
+    responses = asyncio.run(_exchange(service, raw))
+    assert [(status, payload) for status, _, payload in responses] == [(200, b'html:A'), (200, b'{"ok":true}')]
+    assert responses[0][1]['Content-Type'] == 'text/html; charset=utf-8'
+    assert responses[0][1]['X-Guide-Cache'] == 'miss'
+
+
+def test_http_chunked_body(service):
+    # Node's http module sends chunked bodies when no length is set
+    body = json.dumps({'brand': 'A', 'format': 'markdown'}).encode()
+    raw = (_request(_chunked(body), ['Transfer-Encoding: chunked'])
+           + _request(b'', ['Connection: close'], path='/health', method='GET'))
+    responses = asyncio.run(_exchange(service, raw))
+    assert [(status, payload) for status, _, payload in responses] == [(200, b'markdown:A'), (200, b'{"ok":true}')]
+    assert responses[0][1]['Content-Type'] == 'text/markdown; charset=utf-8'
+
+
+@pytest.mark.parametrize('raw, status', [
+    (_request(b'{}', ['Transfer-Encoding: gzip']), 501),
+    (_request(b'zz\r\n{}\r\n0\r\n\r\n', ['Transfer-Encoding: chunked']), 400),
+    (_request(b'{}', ['Content-Length: nope']), 400),
+    (_request(b'', [f'Content-Length: {guide_service.MAX_BODY_BYTES + 1}']), 413),
+])
+def test_http_unreadable_body_closes_connection(service, raw, status):
+    # Whatever follows the body can't be parsed as another request
+    responses = asyncio.run(_exchange(service, raw + _request(b'', path='/health', method='GET')))
+    assert len(responses) == 1
+    assert responses[0][0] == status
+    assert responses[0][1]['Connection'] == 'close'
+
+
+@pytest.mark.parametrize('raw, status', [
+    (_request(b'{"workers": 2}', ['Content-Length: 14', 'Connection: close']), 400),
+    (_request(b'{"catalog": 5}', ['Content-Length: 14', 'Connection: close']), 400),
+    (_request(b'not json', ['Content-Length: 8', 'Connection: close']), 400),
+    (_request(b'[]', ['Content-Length: 2', 'Connection: close']), 400),
+    (_request(b'', ['Connection: close'], method='GET'), 405),
+    (_request(b'', ['Connection: close'], path='/nope', method='GET'), 404),
+])
+def test_http_errors(service, raw, status):
+    responses = asyncio.run(_exchange(service, raw))
+    assert [r[0] for r in responses] == [status]
+    assert 'error' in json.loads(responses[0][2])
+    assert service.calls == []
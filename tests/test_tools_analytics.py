@@ -0,0 +1,117 @@
+import io
+import json
+import os
+
+import pytest
+
+import tools_analytics
+from tools_analytics import ACTION_CODES, LOG_MARKER, _fast_events, _slow_events, log_events
+
+
+def json_line(tool_id, action='click', category='chat', stamp='2025-03-01T10:20:30.123Z'):
+    entry = {'toolId': tool_id, 'toolName': tool_id.title(), 'toolUrl': None,
+             'category': category, 'action': action, 'timestamp': stamp}
+    return f'{LOG_MARKER} {json.dumps(entry, separators=(",", ":"))}\n'
+
+
+def inspect_lines(tool_id, action='visit', stamp='2025-03-01T11:00:00.000Z'):
+    # util.inspect spreads objects over several lines
+    return (f'{LOG_MARKER} {{\n'
+            f"  toolId: '{tool_id}',\n"
+            f"  category: 'images',\n"
+            f"  action: '{action}',\n"
+            f"  timestamp: '{stamp}'\n"
+            f'}}\n')
+
+
+def test_fast_events():
+    text = (json_line('a') + 'unrelated line\n' + json_line('b', 'share', None)
+            + json_line('c', 'unknown') + json_line('d\\"q'))
+    assert _fast_events(text) == [
+        ('a', 'chat', ACTION_CODES['click'], '2025-03-01T10:20:30'),
+        ('b', '', ACTION_CODES['share'], '2025-03-01T10:20:30'),
+        ('d\\"q', 'chat', ACTION_CODES['click'], '2025-03-01T10:20:30'),
+    ]
+
+
+def test_fast_events_misses_inspect_entries():
+    text = json_line('a') + inspect_lines('b')
+    assert len(_fast_events(text)) < text.count(LOG_MARKER)
+
+
+def test_slow_events_multiline_inspect():
+    text = json_line('a') + inspect_lines('b') + 'other output\n'
+    events, consumed = _slow_events(text)
+    assert events == [('a', 'chat', ACTION_CODES['click'], '2025-03-01T10:20:30'),
+                      ('b', 'images', ACTION_CODES['visit'], '2025-03-01T11:00:00')]
+    assert consumed == len(text)
+
+
+def test_slow_events_leaves_open_entry():
+    complete = json_line('a')
+    partial = inspect_lines('b')[:-2]
+    events, consumed = _slow_events(complete + partial)
+    assert [e[0] for e in events] == ['a']
+    assert consumed == len(complete)
+
+
+def collect(path, mark):
+    return [event for events in log_events(str(path), mark) for event in events]
+
+
+@pytest.mark.parametrize('block', [16, 64, 1 << 20])
+def test_log_events_across_blocks(tmp_path, monkeypatch, block):
+    # Lines and util.inspect entries straddling block boundaries are carried
+    # into the next block
+    monkeypatch.setattr(tools_analytics, 'LOG_BLOCK', block)
+    path = tmp_path / 'app.log'
+    text = json_line('a') + inspect_lines('b') + 'noise\n' + json_line('c', 'like') + inspect_lines('d')
+    path.write_text(text)
+    mark = {}
+    assert [e[0] for e in collect(path, mark)] == ['a', 'b', 'c', 'd']
+    assert mark['offset'] == len(text.encode())
+
+
+def test_log_events_resumes_at_offset(tmp_path):
+    path = tmp_path / 'app.log'
+    path.write_text(json_line('a') + json_line('b'))
+    mark = {}
+    assert [e[0] for e in collect(path, mark)] == ['a', 'b']
+
+    # A line without its newline is still being written
+    with open(path, 'a') as f:
+        f.write(json_line('c') + json_line('d')[:-1])
+    assert [e[0] for e in collect(path, mark)] == ['c']
+    with open(path, 'a') as f:
+        f.write('\n')
+    assert [e[0] for e in collect(path, mark)] == ['d']
+    assert collect(path, mark) == []
+    assert mark['offset'] == os.path.getsize(path)
+
+
+def test_log_events_rereads_truncated_log(tmp_path):
+    path = tmp_path / 'app.log'
+    path.write_text(json_line('a') + json_line('b'))
+    mark = {}
+    collect(path, mark)
+    path.write_text(json_line('z'))
+    assert [e[0] for e in collect(path, mark)] == ['z']
+
+
+def test_media_kit_text_is_escaped():
+    from guide_fonts import FONT_FILES
+    if not all(os.path.exists(path) for path in FONT_FILES.values()):
+        pytest.skip('guide fonts not installed')
+    pypdf = pytest.importorskip('pypdf')
+
+    def row(**fields):
+        return dict({a: 1 for a in ACTION_CODES}, interactions=3, revenue=0.1, engagement=0.5, **fields)
+
+    rep = {'from': '2025-03-01', 'to': '2025-03-31', 'events': 5, 'tools': 1, 'revenue': 0.1,
+           'totals': {a: 1 for a in ACTION_CODES}, 'peak_hour_utc': 10,
+           'top_tools': [row(id='notion-qa', name='Notion Q&A', category='data <ml>')],
+           'categories': [row(id='data <ml>')], 'daily': [row(id='2025-03-01')]}
+    data = tools_analytics.render_media_kit(rep, brand='A&B <C>')
+    text = ''.join(page.extract_text() for page in pypdf.PdfReader(io.BytesIO(data)).pages)
+    assert 'A&B <C>' in text and 'Notion Q&A' in text and 'Q&A;' not in text
+    assert text.count('data <ml>') == 2
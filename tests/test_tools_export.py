@@ -0,0 +1,47 @@
+from tools_export import diff_shard
+
+
+def tools(*ids, **changed):
+    return {i: {'id': i, 'name': changed.get(i, i.upper())} for i in ids}
+
+
+def apply_delta(old, delta):
+    # What a client does with a delta: surviving tools stay in place, new
+    # ones are appended, and 'order' replaces the order when present
+    removed = set(delta.get('remove', ()))
+    shard = {i: tool for i, tool in old.items() if i not in removed}
+    for tool in delta.get('upsert', ()):
+        shard[tool['id']] = tool
+    if 'order' in delta:
+        shard = {i: shard[i] for i in delta['order']}
+    return shard
+
+
+def check(old, new):
+    delta = diff_shard(old, new)
+    applied = apply_delta(old, delta)
+    assert applied == new and list(applied) == list(new)
+    return delta
+
+
+def test_unchanged_shard_has_empty_delta():
+    assert check(tools('a', 'b'), tools('a', 'b')) == {}
+
+
+def test_upserts_and_removals():
+    delta = check(tools('a', 'b', 'c'), tools('a', 'c', 'd', c='changed'))
+    assert [t['id'] for t in delta['upsert']] == ['c', 'd']
+    assert delta['remove'] == ['b']
+    assert 'order' not in delta
+
+
+def test_order_only_when_needed():
+    delta = check(tools('a', 'b', 'c'), tools('c', 'a', 'b'))
+    assert delta == {'order': ['c', 'a', 'b']}
+    delta = check(tools('a', 'b'), tools('x', 'a', 'b'))
+    assert delta['order'] == ['x', 'a', 'b']
+
+
+def test_new_and_emptied_shards():
+    assert check({}, tools('a')) == {'upsert': [{'id': 'a', 'name': 'A'}]}
+    assert check(tools('a'), {}) == {'remove': ['a']}
@@ -0,0 +1,28 @@
+import pytest
+
+from tools_index import decode_posting, encode_posting
+
+
+def bitmap(docs):
+    return sum(1 << doc for doc in docs)
+
+
+@pytest.mark.parametrize('docs', [
+    [0],
+    [7],
+    [8],
+    [0, 1, 2, 3, 4, 5, 6, 7, 8],
+    [127, 128, 16383, 16384],
+    [5, 1000, 2 ** 21 + 3],
+    list(range(0, 4000, 3)),
+])
+def test_posting_round_trip(docs):
+    assert decode_posting(encode_posting(docs)) == bitmap(docs)
+
+
+def test_sparse_postings_use_gaps():
+    assert encode_posting([3, 100000])[0] == 'd'
+
+
+def test_dense_postings_use_bitmaps():
+    assert encode_posting(list(range(64)))[0] == 'b'
@@ -0,0 +1,535 @@
+from tools_catalog import ROOT
+from tools_index import iter_catalog
+from atomic_files import write_atomic
+import argparse
+import io
+import json
+import os
+import re
+import sqlite3
+import time
+import numpy as np
+
+# Engagement analytics for the catalog and the media kit. Events (click,
+# visit, share, like, favorite) are read in bulk from the logs written by
+# /api/analytics/click and from the Like/Favorite tables of db/custom.db,
+# aggregated with NumPy a batch at a time, and kept as one small partition
+# per UTC day: per-tool counts by action plus hourly totals. Ingestion is
+# incremental (logs resume at the last byte read, tables at the last rowid)
+# and late events are merged into their day's existing partition, so a
+# report over a month only loads 30 partitions instead of rescanning
+# millions of events.
+#
+#   db/analytics/<YYYY-MM-DD>.npz
+#   db/analytics/state.json
+
+ANALYTICS_DIR = os.path.join(ROOT, 'db', 'analytics')
+CUSTOM_DB = os.path.join(ROOT, 'db', 'custom.db')
+PARTITION_FORMAT = 1
+
+ACTIONS = ('click', 'visit', 'share', 'like', 'favorite')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+INTERACTIONS = ('share', 'like', 'favorite')
+# Estimated revenue per event, as in /api/analytics/click
+REVENUE_PER_EVENT = {'click': 0.001}
+
+# custom.db tables read as events; rows for other item types are ignored
+DB_TABLES = {'Like': 'like', 'Favorite': 'favorite'}
+DB_ITEM_TYPE = 'tool'
+
+LOG_MARKER = '[MONETIZATION TRACKING]'
+LOG_BLOCK = 8 << 20
+BATCH_EVENTS = 1 << 20
+
+_STAMP = re.compile(r'\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d')
+_JSON_CHARS = r'[^"\\\n]*(?:\\.[^"\\\n]*)*'
+# The line the route writes, fields in JSON.stringify order; a block of
+# log made only of these is parsed by one findall
+_JSON_EVENT = re.compile(
+    re.escape(LOG_MARKER) + r' \{"toolId":"(' + _JSON_CHARS + r')",'
+    r'"toolName":(?:"' + _JSON_CHARS + r'"|null),"toolUrl":(?:"' + _JSON_CHARS + r'"|null),'
+    r'"category":(?:"(' + _JSON_CHARS + r')"|null),"action":"(\w+)",'
+    r'"timestamp":"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)')
+# Node's util.inspect output, as written by older versions of the route
+_INSPECT_FIELD = re.compile(r"(\w+):\s*('(?:[^'\\]|\\.)*'|-?\d+(?:\.\d+)?)")
+
+
+def parse_log_entry(text):
+    # text: what follows the marker; JSON from the current route, or an
+    # object literal from util.inspect
+    text = text.strip()
+    if text.startswith('{"'):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+    entry = {}
+    for key, literal in _INSPECT_FIELD.findall(text):
+        if literal.startswith("'"):
+            entry[key] = literal[1:-1].replace("\\'", "'")
+        else:
+            entry[key] = float(literal)
+    return entry or None
+
+
+def _event(entry):
+    # (tool id, category, action code, timestamp), or None if incomplete
+    if not entry:
+        return None
+    tool_id = entry.get('toolId')
+    code = ACTION_CODES.get(entry.get('action'))
+    stamp = entry.get('timestamp')
+    if not tool_id or code is None or not isinstance(stamp, str) or not _STAMP.match(stamp):
+        return None
+    return str(tool_id), entry.get('category') or '', code, stamp[:19]
+
+
+def _fast_events(text):
+    codes = ACTION_CODES
+    events = [(tool_id, category, codes[action], stamp)
+              for tool_id, category, action, stamp in _JSON_EVENT.findall(text)
+              if tool_id and action in codes]
+    if '\\' in text:
+        # Escaped characters in an id or category
+        unescape = lambda value: json.loads(f'"{value}"') if '\\' in value else value
+        events = [(unescape(t), unescape(c), a, s) for t, c, a, s in events]
+    return events
+
+
+def _slow_events(text):
+    # Entry by entry, for blocks with util.inspect output or other shapes.
+    # Returns the events and how much of text was consumed: an entry that
+    # continues past the end of the block is left for the next one.
+    events = []
+    consumed = 0
+    pending = None
+    depth = 0
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        pos += len(line)
+        i = line.find(LOG_MARKER)
+        if i >= 0:
+            line = line[i + len(LOG_MARKER):]
+            if line.lstrip().startswith('{"'):
+                event = _event(parse_log_entry(line))
+                if event:
+                    events.append(event)
+                pending = None
+                consumed = pos
+                continue
+            # A new entry replaces one that never closed
+            pending = []
+            depth = 0
+        elif pending is None:
+            consumed = pos
+            continue
+        pending.append(line)
+        depth += line.count('{') - line.count('}')
+        if depth <= 0:
+            event = _event(parse_log_entry(''.join(pending)))
+            if event:
+                events.append(event)
+            pending = None
+            consumed = pos
+    return events, consumed
+
+
+def log_events(path, mark):
+    # Lists of events from complete lines past mark['offset']; the mark
+    # moves past everything parsed, so a rerun starts after it. A rotated
+    # or truncated log is read again from the start.
+    st = os.stat(path)
+    if mark.get('inode') != st.st_ino or mark.get('offset', 0) > st.st_size:
+        mark.update(inode=st.st_ino, offset=0)
+    with open(path, 'rb') as f:
+        f.seek(mark['offset'])
+        carry = b''
+        while True:
+            block = f.read(LOG_BLOCK)
+            if not block:
+                break
+            block = carry + block
+            # A last line without its newline is still being written
+            end = block.rfind(b'\n') + 1
+            text = block[:end].decode('utf-8', 'surrogateescape')
+            events = _fast_events(text)
+            if len(events) == text.count(LOG_MARKER):
+                consumed = end
+            else:
+                events, consumed = _slow_events(text)
+                consumed = len(text[:consumed].encode('utf-8', 'surrogateescape'))
+            carry = block[consumed:]
+            mark['offset'] += consumed
+            if events:
+                yield events
+
+
+def db_events(db_path, marks, batch=BATCH_EVENTS):
+    # Lists of events from rows added since the last run, by rowid; Prisma
+    # stores DateTime as epoch milliseconds or as text depending on its
+    # version
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        for table, action in DB_TABLES.items():
+            cursor = conn.execute(
+                f'SELECT rowid, itemId, itemType, createdAt FROM "{table}" WHERE rowid > ? ORDER BY rowid',
+                (marks.get(table, 0),))
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                events = []
+                for rowid, item_id, item_type, created in rows:
+                    if item_type != DB_ITEM_TYPE:
+                        continue
+                    if isinstance(created, (int, float)):
+                        stamp = str(np.datetime64(int(created), 'ms').astype('datetime64[s]'))
+                    elif isinstance(created, str) and _STAMP.match(created):
+                        stamp = created[:19]
+                    else:
+                        continue
+                    events.append((item_id, '', ACTION_CODES[action], stamp))
+                marks[table] = rows[-1][0]
+                yield events
+    finally:
+        conn.close()
+
+
+# A day's counts: (tool ids, categories, counts[tool, action], hours[24, action])
+
+def _pick_categories(size, index, categories):
+    # The last non-empty category seen for each tool wins
+    picked = np.full(size, '', dtype=categories.dtype)
+    known = categories != ''
+    picked[index[known]] = categories[known]
+    return picked
+
+
+def aggregate(events):
+    # A batch of events -> {day: day counts}
+    tool_ids, categories, actions, stamps = zip(*events)
+    tool_ids = np.asarray(tool_ids, dtype=str)
+    categories = np.asarray(categories, dtype=str)
+    actions = np.asarray(actions, dtype=np.int64)
+    stamps = np.asarray(stamps, dtype='datetime64[s]')
+
+    tools, tool_index = np.unique(tool_ids, return_inverse=True)
+    tool_categories = _pick_categories(len(tools), tool_index, categories)
+    days = stamps.astype('datetime64[D]')
+    hours = ((stamps - days) // np.timedelta64(1, 'h')).astype(np.int64)
+
+    n = len(ACTIONS)
+    day_values, day_index = np.unique(days, return_inverse=True)
+    order = np.argsort(day_index, kind='stable')
+    bounds = np.searchsorted(day_index[order], np.arange(len(day_values) + 1))
+    result = {}
+    for i, day in enumerate(day_values):
+        rows = order[bounds[i]:bounds[i + 1]]
+        counts = np.bincount(tool_index[rows] * n + actions[rows], minlength=len(tools) * n).reshape(-1, n)
+        hourly = np.bincount(hours[rows] * n + actions[rows], minlength=24 * n).reshape(24, n)
+        seen = counts.any(axis=1)
+        result[str(day)] = (tools[seen], tool_categories[seen], counts[seen], hourly)
+    return result
+
+
+def merge_days(a, b):
+    tool_ids = np.concatenate([a[0], b[0]])
+    tools, index = np.unique(tool_ids, return_inverse=True)
+    counts = np.zeros((len(tools), len(ACTIONS)), dtype=np.int64)
+    np.add.at(counts, index, np.concatenate([a[2], b[2]]))
+    categories = _pick_categories(len(tools), index, np.concatenate([a[1], b[1]]))
+    return tools, categories, counts, a[3] + b[3]
+
+
+def partition_path(directory, day):
+    return os.path.join(directory, f'{day}.npz')
+
+
+def load_partition(path):
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format']) != PARTITION_FORMAT:
+            raise ValueError(f'{path}: unsupported partition format {int(data["format"])}')
+        return data['tools'], data['categories'], data['counts'], data['hours']
+
+
+def save_partition(path, day_counts):
+    tools, categories, counts, hours = day_counts
+    buf = io.BytesIO()
+    np.savez_compressed(buf, format=PARTITION_FORMAT, tools=tools, categories=categories,
+                        counts=counts, hours=hours)
+    write_atomic(path, buf.getvalue())
+
+
+def _read_state(directory):
+    try:
+        with open(os.path.join(directory, 'state.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'logs': {}, 'tables': {}}
+
+
+def ingest(logs=(), custom_db=None, directory=ANALYTICS_DIR):
+    # Sources may overlap (the site logs likes that are also stored in
+    # custom.db), so pick the ones that match how events were recorded
+    state = _read_state(directory)
+    sources = []
+    for path in logs:
+        path = os.path.abspath(path)
+        sources.append(log_events(path, state['logs'].setdefault(path, {})))
+    if custom_db:
+        sources.append(db_events(custom_db, state['tables']))
+
+    pending = {}
+    stats = {'events': 0, 'days': []}
+
+    def flush(batch):
+        stats['events'] += len(batch)
+        for day, day_counts in aggregate(batch).items():
+            pending[day] = merge_days(pending[day], day_counts) if day in pending else day_counts
+
+    batch = []
+    for source in sources:
+        for events in source:
+            batch.extend(events)
+            if len(batch) >= BATCH_EVENTS:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
+
+    # Partitions first, then the read positions: a crash in between means
+    # the next run counts those events again rather than losing them
+    for day in sorted(pending):
+        path = partition_path(directory, day)
+        day_counts = pending[day]
+        if os.path.exists(path):
+            day_counts = merge_days(load_partition(path), day_counts)
+        save_partition(path, day_counts)
+    stats['days'] = sorted(pending)
+    write_atomic(os.path.join(directory, 'state.json'), json.dumps(state, indent=1, sort_keys=True).encode())
+    return stats
+
+
+def _rows(names, counts, revenue, categories=None):
+    visits = counts[:, ACTION_CODES['visit']]
+    interactions = counts[:, [ACTION_CODES[a] for a in INTERACTIONS]].sum(axis=1)
+    rows = []
+    for i, name in enumerate(names):
+        row = {'id': str(name), **{a: int(counts[i, j]) for j, a in enumerate(ACTIONS)}}
+        row['interactions'] = int(interactions[i])
+        row['engagement'] = round(interactions[i] / visits[i], 4) if visits[i] else None
+        row['revenue'] = round(float(revenue[i]), 4)
+        if categories is not None:
+            row['category'] = str(categories[i])
+        rows.append(row)
+    return rows
+
+
+def report(start, end, directory=ANALYTICS_DIR, rates=None, top=20, catalog=None):
+    # Rollups for the days start..end (inclusive, 'YYYY-MM-DD'). catalog:
+    # tool dicts used for names and for categories missing from events
+    rates = REVENUE_PER_EVENT if rates is None else rates
+    rate = np.array([rates.get(a, 0.0) for a in ACTIONS])
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    n = len(ACTIONS)
+
+    parts = []
+    daily = np.zeros((len(days), n), dtype=np.int64)
+    hours = np.zeros((24, n), dtype=np.int64)
+    for i, day in enumerate(days):
+        path = partition_path(directory, day)
+        if os.path.exists(path):
+            part = load_partition(path)
+            parts.append(part)
+            daily[i] = part[2].sum(axis=0)
+            hours += part[3]
+
+    if parts:
+        tools, index = np.unique(np.concatenate([p[0] for p in parts]), return_inverse=True)
+        counts = np.zeros((len(tools), n), dtype=np.int64)
+        np.add.at(counts, index, np.concatenate([p[2] for p in parts]))
+        categories = _pick_categories(len(tools), index, np.concatenate([p[1] for p in parts]))
+    else:
+        tools = categories = np.array([], dtype=str)
+        counts = np.zeros((0, n), dtype=np.int64)
+
+    names = {}
+    if catalog is not None:
+        known = {}
+        for tool in catalog:
+            names[tool['id']] = tool['name']
+            known[tool['id']] = tool.get('category') or ''
+        missing = np.flatnonzero(categories == '')
+        if len(missing):
+            categories = categories.astype(object)
+            categories[missing] = [known.get(t, '') for t in tools[missing]]
+            categories = categories.astype(str)
+    categories = np.where(categories == '', 'other', categories)
+
+    revenue = counts @ rate
+    ranked = np.lexsort((tools, -counts.sum(axis=1), -revenue))[:top]
+    top_tools = _rows(tools[ranked], counts[ranked], revenue[ranked], categories[ranked])
+    for row in top_tools:
+        row['name'] = names.get(row['id'], row['id'])
+
+    category_names, category_index = np.unique(categories, return_inverse=True)
+    category_counts = np.zeros((len(category_names), n), dtype=np.int64)
+    np.add.at(category_counts, category_index, counts)
+    category_revenue = category_counts @ rate
+    by_category = _rows(category_names, category_counts, category_revenue)
+    by_category.sort(key=lambda row: (-row['revenue'], -sum(row[a] for a in ACTIONS), row['id']))
+
+    totals = counts.sum(axis=0)
+    return {
+        'from': str(days[0]),
+        'to': str(days[-1]),
+        'days': len(days),
+        'days_with_data': len(parts),
+        'events': int(totals.sum()),
+        'tools': len(tools),
+        'totals': {a: int(totals[i]) for i, a in enumerate(ACTIONS)},
+        'revenue': round(float(totals @ rate), 4),
+        'rates': {a: float(rate[i]) for i, a in enumerate(ACTIONS)},
+        'peak_hour_utc': int(hours.sum(axis=1).argmax()) if hours.any() else None,
+        'top_tools': top_tools,
+        'categories': by_category,
+        'daily': _rows([str(d) for d in days], daily, daily @ rate),
+    }
+
+
+def month_range(month):
+    # 'YYYY-MM' -> first and last day
+    first = np.datetime64(month, 'M')
+    return str(first.astype('datetime64[D]')), str((first + 1).astype('datetime64[D]') - 1)
+
+
+MEDIA_KIT_TOP = 15
+
+
+def _engagement(value):
+    return f'{value:.1%}' if value is not None else '-'
+
+
+def media_kit_story(rep, brand='MEG.IA', top=MEDIA_KIT_TOP):
+    from reportlab.platypus import Spacer
+    from reportlab.lib.units import cm
+    from generate_monetization_guide import get_styles
+    from guide_tables import build_table
+    from guide_text import GuideParagraph as Paragraph
+    from xml.sax.saxutils import escape
+
+    # The brand and the names and categories from the catalog and the logs
+    # are plain text; build_table sends cells with & or < through markup
+    st = get_styles()
+    totals = rep['totals']
+    interactions = sum(totals[a] for a in INTERACTIONS)
+    story = [
+        Spacer(1, 40),
+        Paragraph('MEDIA KIT', st['title']),
+        Paragraph(escape(brand), st['brand']),
+        Spacer(1, 20),
+        Paragraph(f"Estadisticas del {rep['from']} al {rep['to']}", st['subtitle']),
+        Spacer(1, 30),
+        Paragraph('<b>Cifras clave</b>', st['heading2']),
+    ]
+    figures = [
+        ('Eventos registrados', f"{rep['events']:,}"),
+        ('Visitas a herramientas', f"{totals['visit']:,}"),
+        ('Clics', f"{totals['click']:,}"),
+        ('Compartidos', f"{totals['share']:,}"),
+        ('Me gusta y favoritos', f"{totals['like'] + totals['favorite']:,}"),
+        ('Engagement (interacciones / visitas)', _engagement(interactions / totals['visit'] if totals['visit'] else None)),
+        ('Herramientas con actividad', f"{rep['tools']:,}"),
+        ('Ingresos estimados', f"${rep['revenue']:,.2f}"),
+    ]
+    if rep['peak_hour_utc'] is not None:
+        figures.append(('Hora de mayor actividad (UTC)', f"{rep['peak_hour_utc']:02d}:00"))
+    story.append(build_table(('Metrica', 'Valor'), figures, [9*cm, 5*cm], st['table_cell'], padding=6))
+
+    story.append(Spacer(1, 20))
+    story.append(Paragraph('<b>Herramientas destacadas</b>', st['heading2']))
+    rows = [(escape(t['name']), escape(t['category']), f"{t['visit']:,}", f"{t['click']:,}", f"{t['interactions']:,}", f"${t['revenue']:,.2f}")
+            for t in rep['top_tools'][:top]]
+    story.append(build_table(('Herramienta', 'Categoria', 'Visitas', 'Clics', 'Interacciones', 'Ingresos'), rows,
+                             [3.8*cm, 2.6*cm, 2*cm, 1.8*cm, 3*cm, 2.3*cm], st['table_cell'], padding=4, repeat_rows=1))
+
+    story.append(Spacer(1, 20))
+    story.append(Paragraph('<b>Audiencia por categoria</b>', st['heading2']))
+    rows = [(escape(c['id']), f"{c['visit']:,}", f"{c['click']:,}", f"{c['interactions']:,}", _engagement(c['engagement']), f"${c['revenue']:,.2f}")
+            for c in rep['categories']]
+    story.append(build_table(('Categoria', 'Visitas', 'Clics', 'Interacciones', 'Engagement', 'Ingresos'), rows,
+                             [3.1*cm, 2.1*cm, 2.1*cm, 3*cm, 2.6*cm, 2.6*cm], st['table_cell'], padding=4, repeat_rows=1))
+
+    story.append(Spacer(1, 20))
+    story.append(Paragraph('<b>Actividad diaria</b>', st['heading2']))
+    rows = [(d['id'], f"{d['visit']:,}", f"{d['click']:,}", f"{d['interactions']:,}", f"${d['revenue']:,.2f}")
+            for d in rep['daily']]
+    story.append(build_table(('Dia', 'Visitas', 'Clics', 'Interacciones', 'Ingresos'), rows,
+                             [3.5*cm, 3*cm, 3*cm, 3*cm, 3*cm], st['table_cell'], padding=3, repeat_rows=1))
+    return story
+
+
+def render_media_kit(rep, output=None, brand='MEG.IA', top=MEDIA_KIT_TOP):
+    # Returns the output path, or the PDF bytes when output is None
+    from reportlab.platypus import SimpleDocTemplate
+    from reportlab.lib.pagesizes import A4
+    from guide_text import cached_measurement
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        title=f'Media Kit {brand}',
+        author=brand,
+        subject=f"Estadisticas del {rep['from']} al {rep['to']}",
+    )
+    with cached_measurement():
+        doc.build(media_kit_story(rep, brand, top))
+    data = buf.getvalue()
+    if output is None:
+        return data
+    write_atomic(os.path.abspath(output), data)
+    return output
+
+
+def _rate(text):
+    action, _, value = text.partition('=')
+    if action not in ACTION_CODES:
+        raise argparse.ArgumentTypeError(f'unknown action {action!r}')
+    return action, float(value)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest engagement events and build rollups and media kits')
+    parser.add_argument('--log', nargs='*', default=[], help='logs with [MONETIZATION TRACKING] lines')
+    parser.add_argument('--custom-db', nargs='?', const=CUSTOM_DB, help='also read Like/Favorite from custom.db')
+    parser.add_argument('--dir', default=ANALYTICS_DIR, help='daily partitions')
+    parser.add_argument('--month', help='report on YYYY-MM')
+    parser.add_argument('--from', dest='start', help='report from YYYY-MM-DD')
+    parser.add_argument('--to', dest='end', help='report to YYYY-MM-DD (inclusive)')
+    parser.add_argument('--rate', type=_rate, action='append', default=[], metavar='ACTION=USD',
+                        help='estimated revenue per event, e.g. visit=0.004')
+    parser.add_argument('--top', type=int, default=MEDIA_KIT_TOP)
+    parser.add_argument('--pdf', metavar='FILE', help='write a media kit PDF')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.log or args.custom_db:
+        start = time.perf_counter()
+        stats = ingest(args.log, args.custom_db, args.dir)
+        print(f"{stats['events']:,} eventos nuevos en {len(stats['days'])} dias "
+              f"({time.perf_counter() - start:.2f}s)")
+
+    if args.month:
+        args.start, args.end = month_range(args.month)
+    if args.start:
+        start = time.perf_counter()
+        rep = report(args.start, args.end or args.start, args.dir, dict(REVENUE_PER_EVENT, **dict(args.rate)),
+                     args.top, iter_catalog())
+        if args.pdf:
+            render_media_kit(rep, args.pdf, top=args.top)
+        if args.json:
+            print(json.dumps(rep, indent=2))
+        else:
+            print(f"{rep['from']} a {rep['to']}: {rep['events']:,} eventos, {rep['tools']} herramientas, "
+                  f"${rep['revenue']:,.2f} estimados ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,322 @@
+from html.parser import HTMLParser
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+# Python-side copy of the tool catalog. Both sources are read as streams of
+# entries: src/lib/tools-data.ts line by line, and the theresanaiforthat
+# scrape through an incremental HTML parser. Every entry is hashed from its
+# raw text, so re-ingestion only parses entries whose text changed, and a
+# source whose file hash is unchanged is skipped entirely.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(ROOT, 'db', 'catalog.db')
+TOOLS_TS = os.path.join(ROOT, 'src', 'lib', 'tools-data.ts')
+TAAFT_SCRAPE = os.path.join(ROOT, 'theresanaiforthat_main.json')
+
+COLUMNS = ('id', 'source', 'name', 'description', 'description_es', 'category', 'url',
+           'icon', 'pricing', 'featured', 'trending', 'is_new', 'rating', 'task', 'hash')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tools (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    description_es TEXT,
+    category TEXT,
+    url TEXT,
+    icon TEXT,
+    pricing TEXT,
+    featured INTEGER NOT NULL DEFAULT 0,
+    trending INTEGER NOT NULL DEFAULT 0,
+    is_new INTEGER NOT NULL DEFAULT 0,
+    rating REAL,
+    task TEXT,
+    hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tools_category ON tools (category, rating DESC);
+CREATE INDEX IF NOT EXISTS tools_pricing ON tools (pricing, rating DESC);
+CREATE INDEX IF NOT EXISTS tools_rating ON tools (rating DESC);
+CREATE INDEX IF NOT EXISTS tools_source ON tools (source);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    sha1 TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+"""
+
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_FIELD = re.compile(r'(\w+)\s*:\s*(' + _STRING + r'|true|false|-?\d+(?:\.\d+)?)')
+_ID = re.compile(r'\bid\s*:\s*(' + _STRING + ')')
+_STRINGS = re.compile(_STRING)
+
+_TS_FIELDS = {
+    'descriptionEs': 'description_es',
+    'isNew': 'is_new',
+}
+
+
+def _js_value(literal):
+    if literal == 'true':
+        return 1
+    if literal == 'false':
+        return 0
+    if literal.startswith('"'):
+        return json.loads(literal.replace("\\'", "'"))
+    return float(literal)
+
+
+def iter_ts_entries(path=TOOLS_TS):
+    # Yields the raw text of each object literal in the aiTools array
+    with open(path, encoding='utf-8') as f:
+        in_array = False
+        depth = 0
+        entry = []
+        for line in f:
+            if not in_array:
+                in_array = line.startswith('export const aiTools')
+                continue
+            code = _STRINGS.sub('""', line).split('//', 1)[0]
+            if depth == 0 and code.lstrip().startswith('];'):
+                return
+            opens, closes = code.count('{'), code.count('}')
+            if depth or opens:
+                entry.append(line)
+            depth += opens - closes
+            if entry and depth == 0:
+                yield ''.join(entry)
+                entry = []
+
+
+def parse_ts_entry(raw):
+    row = dict.fromkeys(COLUMNS)
+    row.update(featured=0, trending=0, is_new=0)
+    for key, literal in _FIELD.findall(raw):
+        row[_TS_FIELDS.get(key, key)] = _js_value(literal)
+    return row
+
+
+class _TaaftParser(HTMLParser):
+    # Collects <li class="li ..." data-*> tool cards from the scrape
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self._current = None
+        self._field = None
+        self._li_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'li':
+            if self._current is not None:
+                self._li_depth += 1
+            elif 'li' in classes and attrs.get('data-id'):
+                self._current = {
+                    'taaft_id': attrs['data-id'],
+                    'name': attrs.get('data-name'),
+                    'task': attrs.get('data-task'),
+                    'url': attrs.get('data-url'),
+                    'description': '',
+                    'rating': None,
+                }
+                self._li_depth = 0
+            return
+        if self._current is None:
+            return
+        if 'short_desc' in classes:
+            self._field = 'description'
+        elif 'average_rating' in classes:
+            self._field = 'rating'
+
+    def handle_endtag(self, tag):
+        if self._current is None:
+            return
+        if tag == 'div':
+            self._field = None
+        elif tag == 'li':
+            if self._li_depth:
+                self._li_depth -= 1
+            else:
+                self.entries.append(self._current)
+                self._current = None
+
+    def handle_data(self, data):
+        if self._field == 'description':
+            self._current['description'] += data
+        elif self._field == 'rating' and data.strip():
+            try:
+                self._current['rating'] = float(data.strip())
+            except ValueError:
+                pass
+
+    def drain(self):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def iter_taaft_entries(path=TAAFT_SCRAPE, chunk_size=64 * 1024):
+    with open(path, encoding='utf-8') as f:
+        html = json.load(f)['data']['html']
+    parser = _TaaftParser()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        for entry in parser.drain():
+            yield entry
+    parser.close()
+    yield from parser.drain()
+
+
+def parse_taaft_entry(entry):
+    row = dict.fromkeys(COLUMNS)
+    row.update(
+        id=f"taaft-{entry['taaft_id']}",
+        name=entry['name'],
+        description=entry['description'].strip() or None,
+        url=entry['url'],
+        rating=entry['rating'],
+        task=entry['task'],
+        featured=0, trending=0, is_new=0,
+    )
+    return row
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def connect(db_path=DEFAULT_DB):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _ingest_source(conn, source, path, entries, force=False):
+    stats = {'source': source, 'skipped': False, 'entries': 0, 'parsed': 0, 'deleted': 0}
+    sha1 = _file_sha1(path)
+    known = conn.execute('SELECT sha1 FROM sources WHERE path = ?', (path,)).fetchone()
+    if known and known['sha1'] == sha1 and not force:
+        stats['skipped'] = True
+        return stats
+
+    stored = dict(conn.execute('SELECT id, hash FROM tools WHERE source = ?', (source,)))
+    # Later duplicates of an id win, same as re-inserting them in order
+    latest = {}
+    for raw_key, raw, parse in entries:
+        stats['entries'] += 1
+        latest[raw_key] = (hashlib.sha1(raw.encode('utf-8')).hexdigest(), parse)
+
+    upserts = []
+    for raw_key, (entry_hash, parse) in latest.items():
+        if stored.get(raw_key) == entry_hash and not force:
+            continue
+        row = parse()
+        row.update(id=raw_key, source=source, hash=entry_hash)
+        upserts.append(tuple(row[c] for c in COLUMNS))
+        stats['parsed'] += 1
+
+    placeholders = ', '.join('?' * len(COLUMNS))
+    conn.executemany(f'INSERT OR REPLACE INTO tools ({", ".join(COLUMNS)}) VALUES ({placeholders})', upserts)
+    gone = [(tool_id,) for tool_id in stored if tool_id not in latest]
+    conn.executemany('DELETE FROM tools WHERE id = ?', gone)
+    stats['deleted'] = len(gone)
+    conn.execute('INSERT OR REPLACE INTO sources (path, sha1, ingested_at) VALUES (?, ?, ?)',
+                 (path, sha1, time.time()))
+    return stats
+
+
+def _ts_entries(path):
+    for raw in iter_ts_entries(path):
+        match = _ID.search(raw)
+        if match:
+            yield json.loads(match.group(1)), raw, lambda raw=raw: parse_ts_entry(raw)
+
+
+def _taaft_entries(path):
+    for entry in iter_taaft_entries(path):
+        raw = json.dumps(entry, sort_keys=True)
+        yield f"taaft-{entry['taaft_id']}", raw, lambda entry=entry: parse_taaft_entry(entry)
+
+
+def ingest(db_path=DEFAULT_DB, ts_path=TOOLS_TS, scrape_path=TAAFT_SCRAPE, force=False):
+    conn = connect(db_path)
+    results = []
+    with conn:
+        results.append(_ingest_source(conn, 'tools-data', ts_path, _ts_entries(ts_path), force))
+        if scrape_path and os.path.exists(scrape_path):
+            results.append(_ingest_source(conn, 'taaft', scrape_path, _taaft_entries(scrape_path), force))
+    conn.close()
+    return results
+
+
+def tool_dict(row):
+    # A store row (or parse_*_entry() result) in the tools-data.ts shape
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'description': row['description'],
+        'descriptionEs': row['description_es'],
+        'category': row['category'],
+        'url': row['url'],
+        'icon': row['icon'],
+        'pricing': row['pricing'],
+        'featured': bool(row['featured']),
+        'trending': bool(row['trending']),
+        'isNew': bool(row['is_new']),
+        'rating': row['rating'],
+        'task': row['task'],
+    }
+
+
+def iter_tools(db_path=DEFAULT_DB, category=None, pricing=None, min_rating=None,
+               source='tools-data', limit=None):
+    # Rows come back as dicts using the tools-data.ts field names, ready to be
+    # used as render_guide's config['catalog']
+    clauses, params = [], []
+    for column, value in (('category', category), ('pricing', pricing), ('source', source)):
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    if min_rating is not None:
+        clauses.append('rating >= ?')
+        params.append(min_rating)
+    sql = 'SELECT * FROM tools'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY category, rating DESC, name'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(sql, params):
+            yield tool_dict(row)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest the tool catalog into SQLite')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--force', action='store_true', help='reparse every entry')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for stats in ingest(args.db, force=args.force):
+        state = 'unchanged' if stats['skipped'] else (
+            f"{stats['entries']} entries, {stats['parsed']} parsed, {stats['deleted']} deleted")
+        print(f"{stats['source']}: {state}")
+    print(f"Catalogo actualizado en {time.perf_counter() - start:.2f}s")
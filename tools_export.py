@@ -0,0 +1,195 @@
+from tools_catalog import TOOLS_TS, ROOT, iter_ts_entries, parse_ts_entry, tool_dict
+from atomic_files import write_atomic
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+
+# Static export of the catalog for the site: one JSON shard per category,
+# named after its content hash so it can be cached forever, plus a
+# manifest that lists the current shards. Each export also writes a delta
+# from the previous version (tools added, changed or removed per category),
+# so a client that already has version N fetches a few small deltas
+# instead of the whole catalog, and a deploy only uploads files that moved.
+#
+#   out/manifest.json
+#   out/shards/<category>.<hash>.json
+#   out/deltas/<from>-<to>.json
+
+DEFAULT_EXPORT_DIR = os.path.join(ROOT, 'public', 'catalog')
+EXPORT_FORMAT = 1
+HASH_CHARS = 12
+# Deltas listed in the manifest; clients further behind refetch shards
+KEEP_DELTAS = 10
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_CHARS]
+
+
+def compact_tool(tool):
+    # Same fields as the TS literal: unset and false values are left out
+    return {k: v for k, v in tool.items() if v is not None and v is not False}
+
+
+def load_shards(ts_path=TOOLS_TS):
+    # {category: {id: tool}} in aiTools order; later duplicates of an id
+    # win, as in tools_catalog
+    shards = {}
+    for raw in iter_ts_entries(ts_path):
+        tool = compact_tool(tool_dict(parse_ts_entry(raw)))
+        shards.setdefault(tool.get('category', 'other'), {})[tool['id']] = tool
+    return shards
+
+
+def diff_shard(old, new):
+    # old/new: {id: tool}
+    delta = {}
+    upserts = [tool for tool_id, tool in new.items() if old.get(tool_id) != tool]
+    removed = [tool_id for tool_id in old if tool_id not in new]
+    if upserts:
+        delta['upsert'] = upserts
+    if removed:
+        delta['remove'] = removed
+    # Applying the delta keeps surviving tools in place and appends new
+    # ones; the full id order is only sent when that isn't the new order
+    applied = [tool_id for tool_id in old if tool_id in new]
+    applied += [tool_id for tool_id in new if tool_id not in old]
+    if applied != list(new):
+        delta['order'] = list(new)
+    return delta
+
+
+def _read_json(path):
+    try:
+        with open(path, 'rb') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def export(out_dir=DEFAULT_EXPORT_DIR, ts_path=TOOLS_TS):
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    previous = _read_json(manifest_path)
+    if previous is not None and previous.get('format') != EXPORT_FORMAT:
+        previous = None
+
+    shards = load_shards(ts_path)
+    entries = {}
+    written = 0
+    for category in sorted(shards):
+        tools = shards[category]
+        data = _dumps(list(tools.values()))
+        digest = _digest(data)
+        name = f'shards/{category}.{digest}.json'
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            write_atomic(path, data)
+            written += len(data)
+        entries[category] = {'file': name, 'hash': digest, 'tools': len(tools), 'bytes': len(data)}
+
+    version = _digest(_dumps({c: e['hash'] for c, e in entries.items()}))
+    report = {
+        'version': version,
+        'monolith_bytes': os.path.getsize(ts_path),
+        'export_bytes': sum(e['bytes'] for e in entries.values()),
+        'written_bytes': written,
+        'changed_shards': [],
+        'delta_bytes': None,
+    }
+
+    deltas = []
+    if previous is not None:
+        deltas = previous.get('deltas', [])
+        if previous['version'] != version:
+            changes = {}
+            for category in sorted(set(entries) | set(previous['shards'])):
+                old_entry = previous['shards'].get(category)
+                new_entry = entries.get(category)
+                if old_entry and new_entry and old_entry['hash'] == new_entry['hash']:
+                    continue
+                old_tools = {}
+                if old_entry:
+                    old_tools = {t['id']: t for t in _read_json(os.path.join(out_dir, old_entry['file']))}
+                changes[category] = diff_shard(old_tools, shards.get(category, {}))
+            data = _dumps({'from': previous['version'], 'to': version, 'changes': changes})
+            name = f"deltas/{previous['version']}-{version}.json"
+            write_atomic(os.path.join(out_dir, name), data)
+            written += len(data)
+            deltas = [*deltas, {'from': previous['version'], 'to': version, 'file': name, 'bytes': len(data)}]
+            report['changed_shards'] = sorted(changes)
+            report['delta_bytes'] = len(data)
+            report['written_bytes'] = written
+    deltas = deltas[-KEEP_DELTAS:]
+
+    manifest = {
+        'format': EXPORT_FORMAT,
+        'version': version,
+        'generated_at': int(time.time()),
+        'total': sum(e['tools'] for e in entries.values()),
+        'shards': entries,
+        'deltas': deltas,
+    }
+    write_atomic(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode())
+    _prune(out_dir, manifest)
+    report['manifest_bytes'] = os.path.getsize(manifest_path)
+    return report
+
+
+def _prune(out_dir, manifest):
+    # Only the current shards and the listed deltas are kept; deltas are
+    # self-contained, so older shards are never needed again
+    keep = {e['file'] for e in manifest['shards'].values()} | {d['file'] for d in manifest['deltas']}
+    for sub in ('shards', 'deltas'):
+        directory = os.path.join(out_dir, sub)
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if f'{sub}/{entry.name}' not in keep:
+                os.remove(entry.path)
+
+
+def _gzip_size(path):
+    with open(path, 'rb') as f:
+        return len(gzip.compress(f.read(), 9))
+
+
+def print_report(report, out_dir, ts_path=TOOLS_TS):
+    manifest = _read_json(os.path.join(out_dir, 'manifest.json'))
+    shards = manifest['shards']
+    monolith = report['monolith_bytes']
+    monolith_gz = _gzip_size(ts_path)
+    largest = max(shards.values(), key=lambda e: e['bytes'])
+    largest_gz = _gzip_size(os.path.join(out_dir, largest['file']))
+
+    def line(label, size, base=monolith):
+        print(f'  {label:<34} {size:>10,} B  {1 - size / base:>6.1%} menos')
+
+    print(f"Version {report['version']}: {manifest['total']} herramientas en {len(shards)} categorias")
+    print(f'  {"tools-data.ts (monolitico)":<34} {monolith:>10,} B  (gzip {monolith_gz:,} B)')
+    line('todas las categorias', report['export_bytes'])
+    line(f"categoria mas grande ({largest['file'].split('/')[1].split('.')[0]})", largest['bytes'])
+    line('  gzip', largest_gz, monolith_gz)
+    if report['delta_bytes'] is not None:
+        line(f"delta ({len(report['changed_shards'])} categorias cambiadas)", report['delta_bytes'])
+    print(f"  escrito en esta exportacion: {report['written_bytes']:,} B")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the catalog as per-category shards with deltas')
+    parser.add_argument('--ts', default=TOOLS_TS, help='tools-data.ts to export')
+    parser.add_argument('-o', '--out', default=DEFAULT_EXPORT_DIR)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    report = export(args.out, args.ts)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.out, args.ts)
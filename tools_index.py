@@ -0,0 +1,313 @@
+from tools_catalog import TOOLS_TS, ROOT, iter_ts_entries, parse_ts_entry, _file_sha1
+from atomic_files import write_atomic
+from itertools import islice
+import argparse
+import base64
+import json
+import os
+import re
+import time
+import unicodedata
+
+# Prebuilt search index for /api/tools. Documents are positions in the
+# aiTools array, so a lookup result maps straight back to aiTools[i].
+#
+# Every posting list is a bitmap over the documents (a Python int here, a
+# byte array on disk), so filters combine with plain AND/OR and the cost of
+# a lookup depends on the query, not on the catalog size. Text is folded
+# (lowercase, accents stripped, so "generacion" finds "generación") and
+# split into tokens. Search terms match any token that contains them, like
+# the route's includes() scan: terms of up to three characters hit a
+# precomputed n-gram posting; longer terms find their candidate tokens via
+# the vocabulary's trigram postings, check them, and OR the token postings.
+# Terms with punctuation or symbols ("c++", ".io", "gpt-4") narrow the
+# documents by their tokens, then check each candidate's folded field text
+# for the whole term. Query terms that are English or Spanish stopwords are
+# ignored.
+
+DEFAULT_INDEX = os.path.join(ROOT, 'db', 'tools-index.json')
+INDEX_VERSION = 2
+GRAM_SIZE = 3
+TOP_RATED = 4.5
+TERM_CACHE_SIZE = 4096
+
+SEARCH_FIELDS = ('name', 'description', 'description_es')
+
+STOPWORDS = frozenset('''
+    a an and are as at be by for from in into is it of on or the to with your
+    al con de del el en es la las lo los para por que se su sus un una y
+'''.split())
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return _TOKEN.findall(fold(text))
+
+
+def grams(token):
+    found = set()
+    for n in range(1, GRAM_SIZE + 1):
+        for i in range(len(token) - n + 1):
+            found.add(token[i:i + n])
+    return found
+
+
+def query_terms(text):
+    # Whitespace-separated and folded; a term is either one token or
+    # matched literally against the field text
+    terms = fold(text).split()
+    return [t for t in terms if t not in STOPWORDS] or terms
+
+
+def field_text(tool):
+    # Folded search fields, separated so a term never spans two of them
+    return '\n'.join(fold(tool.get(field) or '') for field in SEARCH_FIELDS)
+
+
+# On disk a posting is either a bitmap ('b') or, when that is smaller, the
+# gaps between document numbers as LEB128 varints ('d'), base64-encoded
+
+def _varints(numbers):
+    out = bytearray()
+    for n in numbers:
+        while n > 0x7f:
+            out.append(n & 0x7f | 0x80)
+            n >>= 7
+        out.append(n)
+    return bytes(out)
+
+
+def encode_posting(docs):
+    # docs: ascending document numbers
+    gaps = _varints(b - a for a, b in zip([-1] + docs, docs))
+    bitmap = bytearray(docs[-1] // 8 + 1)
+    if len(gaps) < len(bitmap):
+        return 'd' + base64.b64encode(gaps).decode()
+    for doc in docs:
+        bitmap[doc >> 3] |= 1 << (doc & 7)
+    return 'b' + base64.b64encode(bytes(bitmap)).decode()
+
+
+def decode_posting(text):
+    data = base64.b64decode(text[1:])
+    if text[0] == 'b':
+        return int.from_bytes(data, 'little')
+    bitmap = 0
+    doc = -1
+    shift = 0
+    gap = 0
+    for byte in data:
+        gap |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        doc += gap
+        bitmap |= 1 << doc
+        gap = shift = 0
+    return bitmap
+
+
+def iter_catalog(ts_path=TOOLS_TS):
+    # Same order and duplicates as the aiTools array
+    for raw in iter_ts_entries(ts_path):
+        yield parse_ts_entry(raw)
+
+
+def _add(table, key, doc):
+    docs = table.setdefault(key, [])
+    if not docs or docs[-1] != doc:
+        docs.append(doc)
+
+
+def build_index(tools):
+    postings = {}
+    tokens = {}
+    facets = {}
+    ratings = []
+    texts = []
+
+    for doc, tool in enumerate(tools):
+        text = field_text(tool)
+        texts.append(text)
+        for token in _TOKEN.findall(text):
+            _add(tokens, token, doc)
+        _add(facets, f"category:{tool.get('category')}", doc)
+        _add(facets, f"pricing:{tool.get('pricing')}", doc)
+        for flag, key in (('featured', 'featured'), ('trending', 'trending'), ('is_new', 'isNew')):
+            if tool.get(flag):
+                _add(facets, key, doc)
+        rating = tool.get('rating') or 0
+        if rating >= TOP_RATED:
+            _add(facets, 'topRated', doc)
+        ratings.append(rating)
+
+    vocab = sorted(tokens)
+    token_grams = {}
+    for token_id, token in enumerate(vocab):
+        for gram in grams(token):
+            if len(gram) < GRAM_SIZE:
+                # Short grams are looked up directly, by document
+                for doc in tokens[token]:
+                    postings.setdefault(gram, set()).add(doc)
+            else:
+                _add(token_grams, gram, token_id)
+                postings.setdefault(gram, set()).update(tokens[token])
+
+    return {
+        'version': INDEX_VERSION,
+        'docs': len(ratings),
+        'postings': {k: encode_posting(sorted(v)) for k, v in sorted(postings.items())},
+        'vocab': vocab,
+        'tokens': [encode_posting(tokens[t]) for t in vocab],
+        'token_grams': {k: encode_posting(v) for k, v in sorted(token_grams.items())},
+        'facets': {k: encode_posting(v) for k, v in sorted(facets.items())},
+        # For terms the tokens can't answer
+        'texts': texts,
+        # topRated documents, highest rating first (stable, like the
+        # route's sort)
+        'by_rating': sorted((d for d, r in enumerate(ratings) if r >= TOP_RATED), key=lambda d: -ratings[d]),
+    }
+
+
+def write_index(path=DEFAULT_INDEX, ts_path=TOOLS_TS):
+    index = build_index(iter_catalog(ts_path))
+    index['source_sha1'] = _file_sha1(ts_path)
+    write_atomic(path, json.dumps(index, separators=(',', ':')).encode())
+    return index
+
+
+class SearchIndex:
+    # Postings are decoded the first time a query touches them; warm()
+    # decodes everything up front
+
+    def __init__(self, index):
+        if index['version'] != INDEX_VERSION:
+            raise ValueError(f"unsupported index version {index['version']}")
+        self.docs = index['docs']
+        self.all = (1 << self.docs) - 1
+        self._vocab = index['vocab']
+        self._by_rating = index['by_rating']
+        self._texts = index['texts']
+        self._encoded = {
+            'postings': index['postings'],
+            'tokens': dict(enumerate(index['tokens'])),
+            'token_grams': index['token_grams'],
+            'facets': index['facets'],
+        }
+        self._decoded = {name: {} for name in self._encoded}
+        self._terms = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def warm(self):
+        for name, table in self._encoded.items():
+            for key in table:
+                self._lookup(name, key)
+        return self
+
+    def _lookup(self, name, key):
+        decoded = self._decoded[name]
+        bitmap = decoded.get(key)
+        if bitmap is None:
+            encoded = self._encoded[name].get(key)
+            bitmap = decode_posting(encoded) if encoded else 0
+            decoded[key] = bitmap
+        return bitmap
+
+    def facet(self, key):
+        return self._lookup('facets', key)
+
+    def match_term(self, term):
+        if not _TOKEN.fullmatch(term):
+            return self._match_literal(term)
+        if len(term) <= GRAM_SIZE:
+            return self._lookup('postings', term)
+        bitmap = self._terms.get(term)
+        if bitmap is None:
+            candidates = -1
+            for i in range(len(term) - GRAM_SIZE + 1):
+                candidates &= self._lookup('token_grams', term[i:i + GRAM_SIZE])
+            bitmap = 0
+            for token_id in positions(candidates):
+                if term in self._vocab[token_id]:
+                    bitmap |= self._lookup('tokens', token_id)
+            if len(self._terms) >= TERM_CACHE_SIZE:
+                self._terms.clear()
+            self._terms[term] = bitmap
+        return bitmap
+
+    def _match_literal(self, term):
+        bitmap = self._terms.get(term)
+        if bitmap is None:
+            # Every token of the term is a substring of the text around it;
+            # a term with no tokens at all checks every document
+            candidates = self.all
+            for token in _TOKEN.findall(term):
+                candidates &= self.match_term(token)
+            bitmap = 0
+            for doc in positions(candidates):
+                if term in self._texts[doc]:
+                    bitmap |= 1 << doc
+            if len(self._terms) >= TERM_CACHE_SIZE:
+                self._terms.clear()
+            self._terms[term] = bitmap
+        return bitmap
+
+    def filter(self, search='', category='all', pricing=None, featured=False,
+               trending=False, newest=False, top_rated=False):
+        bitmap = self.all
+        if category and category != 'all':
+            bitmap &= self.facet(f'category:{category}')
+        if pricing:
+            bitmap &= self.facet(f'pricing:{pricing}')
+        for enabled, key in ((featured, 'featured'), (trending, 'trending'),
+                             (newest, 'isNew'), (top_rated, 'topRated')):
+            if enabled:
+                bitmap &= self.facet(key)
+        for term in query_terms(search):
+            if not bitmap:
+                break
+            bitmap &= self.match_term(term)
+        return bitmap
+
+    def query(self, page=1, limit=50, top_rated=False, **filters):
+        # Returns (total, document numbers for the page)
+        bitmap = self.filter(top_rated=top_rated, **filters)
+        total = bitmap.bit_count()
+        start = (page - 1) * limit
+        if not top_rated:
+            return total, list(islice(positions(bitmap), start, start + limit))
+        # Walk the rating order until the page is full
+        bits = bitmap.to_bytes((self.docs + 7) // 8, 'little')
+        ranked = (d for d in self._by_rating if bits[d >> 3] >> (d & 7) & 1)
+        return total, list(islice(ranked, start, start + limit))
+
+
+def positions(bitmap):
+    # Set bits in ascending order; str.find does the scanning in C
+    bits = bin(bitmap)[:1:-1]
+    i = bits.find('1')
+    while i >= 0:
+        yield i
+        i = bits.find('1', i + 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the /api/tools search index')
+    parser.add_argument('--ts', default=TOOLS_TS, help='tools-data.ts to index')
+    parser.add_argument('-o', '--output', default=DEFAULT_INDEX)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = write_index(args.output, args.ts)
+    print(f"{index['docs']} herramientas, {len(index['vocab'])} tokens, "
+          f"{os.path.getsize(args.output):,} bytes en {time.perf_counter() - start:.2f}s")